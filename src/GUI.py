@@ -1,31 +1,194 @@
-from src import importer, logic, img_aqcuisition
+from src import importer, catalog, progress_file
 from src.chart_manager import ChartManager
+from src.inventory import Inventory
 from src.inventory_calc import InventoryManager
-from src.utils import resource_path, ensure_row_index, safe_str, get_set_df
+from src.scheduler import RefreshScheduler
+from src.workers import ComputeExecutor
+from src.image_cache import ThumbnailCache, ThumbnailPrefetcher
+from src.image_pack import ArchiveStore
+from src.session import save_session, source_paths
+from src.journal import InventoryJournal
+from src.profile_store import ProfileStore
+from src.utils import resource_path, ensure_row_index, safe_str, get_set_df, LRUCache
+from src.virtual_tree import VirtualTree
 import tkinter as tk
-from tkinter import ttk, filedialog
+from tkinter import ttk, filedialog, simpledialog
 import polars as pl
-from PIL import Image, ImageTk
 import os
 import pathlib
-import requests
 import threading
-import json
+import queue
 import re
 
 
 class CollectionViewer(tk.Tk):
-    def __init__(self, dataframe: pl.DataFrame):
+    SESSION_AUTOSAVE_MS = 15000
+
+    def __init__(self, dataframe: pl.DataFrame, fast_start: bool = True,
+                 startup_timer=None, report_startup: bool = False, session=None):
         super().__init__()
+        self.startup_timer = startup_timer
+        self.report_startup = report_startup
         self._init_ui()
         self._init_data(dataframe)
         self._create_menu()
         self._create_widgets()
+        self._restore_session(session)
+        self._init_journal()
+        self._mark_startup("widgets")
         self.chart_manager = ChartManager(self.chart_frame)
-        self.inventory_manager = InventoryManager(self.df, self.inventory)
-        self.show_dataframe(self.df)
+        self.chart_cache = LRUCache(max_entries=32)
+        self.inventory_manager = None
+        self.executor = ComputeExecutor(self)
+        self._create_refresh_scheduler()
         self.base_dir = pathlib.Path(__file__).resolve().parent
 
+        if fast_start:
+            # Show the tree first; stats and panels follow once the window is up.
+            self.refresh_scheduler.hold()
+            self._show_initial_view()
+            self._mark_startup("tree")
+            self.bind("<Map>", self._on_first_map)
+        else:
+            self._reset_inventory_manager()
+            self._show_initial_view()
+            self._mark_startup("tree")
+
+        # Without a restored session, the first autosave writes one.
+        self._session_saved = self._session_state() if session else None
+        self.after(self.SESSION_AUTOSAVE_MS, self._autosave_session)
+
+    def destroy(self):
+        if hasattr(self, "_session_saved"):
+            self._save_session()
+        if hasattr(self, "profile_store"):
+            self._save_active_profile()
+            if self.profile_store is not None:
+                self.profile_store.close()
+        if hasattr(self, "journal"):
+            if self.journal.changes:
+                self.journal.compact(self.df, self.inventory, self.json_path)
+            self.journal.close()
+        if getattr(self, "downloader", None) is not None:
+            self.downloader.cancel()
+        if hasattr(self, "executor"):
+            self.executor.shutdown()
+        if hasattr(self, "prefetcher"):
+            self.prefetcher.shutdown()
+        super().destroy()
+
+    ## STARTUP
+
+    def _mark_startup(self, label):
+        if self.startup_timer is not None:
+            self.startup_timer.mark(label)
+
+    def _on_first_map(self, event=None):
+        # The root's bindings also see every child widget being mapped.
+        if event is not None and event.widget is not self:
+            return
+        self.unbind("<Map>")
+        self.update_idletasks()
+        self._mark_startup("first paint")
+        self.after_idle(self._finish_startup)
+
+    def _finish_startup(self):
+        if self.inventory_manager is None:
+            self._reset_inventory_manager()
+        self._mark_startup("stats")
+        self.refresh_scheduler.release()
+        self._mark_startup("panels")
+
+        if self.startup_timer is not None:
+            self.set_status_message(f"Ready in {self.startup_timer.total():.2f} s")
+            if self.report_startup:
+                print(self.startup_timer.report())
+
+    def _reset_inventory_manager(self):
+        encodings, self._session_encodings = self._session_encodings, None
+        if self.inventory_manager is None:
+            self.inventory_manager = InventoryManager(self.df, self.inventory, encodings)
+        else:
+            self.inventory_manager.reset(self.df, self.inventory, encodings)
+
+    def _show_initial_view(self):
+        group = self.group_var.get()
+        if group != "Checked" and group in self.df.columns:
+            self.on_group_change(group)
+        else:
+            self.show_dataframe(self.df)
+
+    ## SESSION
+
+    def _restore_session(self, session):
+        self._session_encodings = None
+        self._session_df = None
+        if session is None:
+            return
+
+        self.json_path = session.json_path
+        self.inventory = Inventory.from_mask(session.mask)
+        self.is_set = session.is_set
+        self.button_var.set(session.is_set)
+        self.group_var.set(session.group)
+        self._session_encodings = session.encodings
+        self._session_df = self.df
+
+    def _init_journal(self):
+        """Replay changes not yet saved when the app last stopped, then start a fresh journal."""
+
+        self.journal = InventoryJournal()
+        saved = self.journal.saved_catalog()
+
+        if saved is not None and str(saved) != str(self.json_path):
+            # The session came back with another catalog (e.g. a set file changed);
+            # reopen the one the journal was kept for rather than drop its changes.
+            df = self.df
+            json_path = self._find_catalog(saved)
+            if json_path and self._load_catalog(json_path):
+                if self.df is not df:
+                    self.inventory = Inventory(self.df.height)
+                    self._session_encodings = None
+            else:
+                self.journal.set_aside()
+                self.set_status_message("Unsaved inventory changes kept aside: their catalog is missing")
+                saved = None
+
+        mask = self.journal.recover(self.df) if saved is not None else None
+        if mask is not None and bool((mask != self.inventory.mask).any()):
+            self.inventory = Inventory.from_mask(mask)
+            self.set_status_message("Recovered unsaved inventory changes")
+
+        self.journal.start()
+        self.journal.compact(self.df, self.inventory, self.json_path)
+
+    def _session_state(self):
+        return (self.inventory.version, self.group_var.get(), self.is_set,
+                str(self.json_path), id(self.df))
+
+    def _save_session(self):
+        state = self._session_state()
+        if state == self._session_saved:
+            return
+
+        try:
+            save_session(
+                self.df, self.inventory, self.json_path, self.group_var.get(), self.is_set,
+                stats=self.inventory_manager.stats if self.inventory_manager else None,
+                write_catalog=self._session_df is not self.df,
+            )
+            self._session_df = self.df
+            self._session_saved = state
+        except Exception as e:
+            print(f"Could not save session: {e}")
+
+    def _autosave_session(self):
+        self._save_session()
+        self._save_active_profile()
+        if self.journal.changes:
+            self.journal.compact(self.df, self.inventory, self.json_path)
+        self.after(self.SESSION_AUTOSAVE_MS, self._autosave_session)
+
     def _init_ui(self):
         self.title("Test APK")
         self.geometry("1280x720")
@@ -38,14 +201,20 @@ class CollectionViewer(tk.Tk):
         self.group_var = tk.StringVar(self)
         self.button_var = tk.BooleanVar()
         self.is_set = False
-        self.groups_all = {}
-        self.groups_set = {}
+        self.groups = None
         self.current_group = None
-        self.inventory = set()
-        self.checkbox_vars = {}
+        self.inventory = Inventory(self.df.height)
         self.json_path = resource_path("sets/a3-celestial-guardians.json")
         self.local_image_folder = "img"
+        self.profile_store = None
+        self.downloader = None
+        self.active_profile = None
+        self._profile_version = None
+        self.image_archives = ArchiveStore()
+        self.thumbnails = ThumbnailCache(size=(480, 420), archives=self.image_archives)
+        self.prefetcher = ThumbnailPrefetcher(self.thumbnails)
         self.sets_folder = "sets"
+        self.catalog = catalog.Catalog(self.sets_folder, process=self._process_dataframe)
         self.pack_display_order = self.df.select("pack").unique().to_series().to_list()
         os.makedirs(self.local_image_folder, exist_ok=True)
 
@@ -63,6 +232,7 @@ class CollectionViewer(tk.Tk):
         menubar = tk.Menu(self)
         self._create_file_menu(menubar)
         self._create_json_menu(menubar)
+        self._create_profile_menu(menubar)
         self.config(menu=menubar)
 
     def _create_file_menu(self, menubar):
@@ -77,9 +247,17 @@ class CollectionViewer(tk.Tk):
         json_menu.add_command(
             label="Fetch Card Images", command=self._show_download_progress
         )
+        json_menu.add_command(label="Missing Across Sets...", command=self.show_missing_across_sets)
         json_menu.add_command(label="Clean Database", command=self.clean_json)
         menubar.add_cascade(label="Dataset", menu=json_menu)
 
+    def _create_profile_menu(self, menubar):
+        profile_menu = tk.Menu(menubar, tearoff=0)
+        profile_menu.add_command(label="Save As Profile...", command=self.save_as_profile)
+        profile_menu.add_command(label="Switch Profile...", command=self.show_profile_picker)
+        profile_menu.add_command(label="Profiles Overview", command=self.show_profiles_overview)
+        menubar.add_cascade(label="Profiles", menu=profile_menu)
+
     def import_json(self):
         file_paths = filedialog.askopenfilenames(
             defaultextension=".json",
@@ -89,18 +267,18 @@ class CollectionViewer(tk.Tk):
         if not file_paths:
             return
 
+        self._detach_profile()
         try:
-            dfs = [
-                self._process_dataframe(importer.read_json_file(path))
-                for path in file_paths
-            ]
-            self.df = pl.concat(dfs, how="vertical")
+            self.df = self._read_catalog(";".join(file_paths))
             self.group_var.set(self.df.columns[0])
-            self.inventory = set()
+            self.inventory = Inventory(self.df.height)
+            self._reset_inventory_manager()
+            self.tree_view.reset()
             self.show_dataframe(self.df)
             self.json_path = (
                 file_paths[0] if len(file_paths) == 1 else ";".join(file_paths)
             )
+            self.journal.compact(self.df, self.inventory, self.json_path)
         except Exception as e:
             self.set_status_message(f"Failed to import database: {e}")
 
@@ -122,16 +300,9 @@ class CollectionViewer(tk.Tk):
 
         try:
             if not getattr(self, "json_path", None):
-                self.json_path = pathlib.Path(
-                    resource_path("/sets/a3-celestial-guardians.json")
-                )
+                self.json_path = resource_path("sets/a3-celestial-guardians.json")
 
-            elif isinstance(self.json_path, str):
-                self.json_path = pathlib.Path(self.json_path)
-
-            with open(file_path, "w") as f:
-                f.write(f"#json_path={self.json_path}\n")
-                f.write("\n".join(map(str, self.inventory)) + "\n")
+            progress_file.write_progress(file_path, self.df, self.inventory, self.json_path)
 
         except Exception:
             self.set_status_message("Failed to save inventory")
@@ -147,56 +318,93 @@ class CollectionViewer(tk.Tk):
 
         file_path = pathlib.Path(file_path_str)
 
+        self._detach_profile()
         try:
-            json_path, indices = self._read_and_parse_progress_file(file_path)
-            self._update_df_and_inventory(json_path, indices)
+            progress = progress_file.read_progress(file_path)
+            json_path = self._find_catalog(progress.json_path)
+            catalog_loaded = bool(json_path) and self._load_catalog(json_path)
+            if catalog_loaded:
+                progress.json_path = json_path
+
+            if progress.version == 1 and not catalog_loaded:
+                # v1 stores row numbers, which only mean something in their own catalog.
+                self.set_status_message(
+                    "Inventory not loaded: the catalog it was saved with is not available"
+                )
+                return
+
+            mask, unmatched = progress.mask_for(self.df)
+            self._update_df_and_inventory(Inventory.from_mask(mask))
+
+            messages = []
+            if progress.version == 1:
+                progress_file.migrate_v1(file_path, progress, self.df, self.inventory)
+                messages.append("Inventory file upgraded to the card-id format")
+            elif progress.fingerprint != progress_file.catalog_fingerprint(self.df):
+                messages.append("Inventory was saved with a different catalog; cards matched by id")
+
+            if unmatched:
+                messages.append(f"{unmatched} saved cards are not in the loaded catalog")
+            if messages:
+                self.set_status_message(". ".join(messages))
 
         except Exception as e:
             self.set_status_message(f"Failed to load inventory: {e}")
 
-    def _read_and_parse_progress_file(self, file_path) -> tuple:  # type: ignore
-        json_path_str = ""
-        indices = set()
+    def _find_catalog(self, json_path):
+        """``json_path`` with each missing file swapped for the set with the same code in
+        the sets folder (the install may have moved since it was saved); None if one has none."""
 
-        try:
-            with open(file_path, "r") as f:
-                json_line = next(f, "").strip()
-                if json_line.startswith("#json_path="):
-                    json_path_str = json_line.split("=", 1)[1]
+        paths = []
+        for path in source_paths(json_path):
+            if not os.path.exists(resource_path(path)):
+                path = self.catalog.files().get(catalog.set_code(path))
+                if path is None:
+                    return None
+            paths.append(path)
+        return ";".join(paths) or None
 
-                for line in f:
-                    line = line.strip()
-                    if line:
-                        try:
-                            idx = int(line)
-                            indices.add(idx)
-                        except ValueError:
-                            indices.add(line)
+    def _read_catalog(self, json_path):
+        """Reads one set JSON, or several joined with ';', as a single catalog.
 
-            json_path = pathlib.Path(json_path_str) if json_path_str else None
+        Files from the sets folder come from the shared multi-set catalog, so
+        switching between sets already read is a slice of it.
+        """
 
-            return json_path, indices
+        paths = [path for path in str(json_path).split(";") if path]
+        codes = [self.catalog.code_of(path) for path in paths]
+        if all(codes):
+            return self.catalog.sets(codes)
 
-        except Exception as e:
-            self.set_status_message(f"Error en el archivo: {e}")
+        dfs = [self._process_dataframe(importer.read_json_file(path)) for path in paths]
+        return dfs[0] if len(dfs) == 1 else catalog.concat_sets(dfs)
 
-    def _update_df_and_inventory(self, json_path, indices):
-        if json_path and getattr(self, "json_path", None) != json_path:
-            try:
-                df = importer.read_json_file(json_path)
-                df = self._process_dataframe(df)
+    def _load_catalog(self, json_path) -> bool:
+        """Switches to the catalog at ``json_path``; True when it is the one now shown."""
 
-                self.df = df
-                self.json_path = json_path
+        if not json_path:
+            return False
+        if str(getattr(self, "json_path", "")) == str(json_path):
+            return True
 
-                if self.df.columns:
-                    self.group_var.set(self.df.columns[0])
-                    self.show_dataframe(self.df)
+        try:
+            self.df = self._read_catalog(json_path)
+            self.json_path = json_path
+
+            if self.df.columns:
+                self.group_var.set(self.df.columns[0])
+                self.groups = None
+                self.tree_view.reset()
+            return True
 
-            except Exception as e:
-                self.set_status_message(f"Failed to load referenced JSON: {e}")
+        except Exception as e:
+            self.set_status_message(f"Failed to load referenced JSON: {e}")
+            return False
 
-        self.inventory = indices
+    def _update_df_and_inventory(self, inventory):
+        self.inventory = inventory
+        self._reset_inventory_manager()
+        self.journal.compact(self.df, self.inventory, self.json_path)
 
         if self.groups and self.df.columns:
             self.on_group_change(self.group_var.get())
@@ -204,11 +412,139 @@ class CollectionViewer(tk.Tk):
         elif not self.groups and self.df.columns:
             self.show_dataframe(self.df)
 
+    ## PROFILES
+
+    def _profiles(self):
+        if self.profile_store is None:
+            self.profile_store = ProfileStore()
+        return self.profile_store
+
+    def _save_active_profile(self):
+        if self.active_profile is None or self.inventory.version == self._profile_version:
+            return
+        try:
+            self._profiles().save_inventory(self.active_profile, self.df, self.inventory)
+            self._profile_version = self.inventory.version
+        except Exception as e:
+            self.set_status_message(f"Failed to save profile: {e}")
+
+    def _detach_profile(self):
+        """Save the active profile and stop tracking it, before another inventory replaces it."""
+        self._save_active_profile()
+        self.active_profile = None
+
+    def save_as_profile(self):
+        name = simpledialog.askstring("Save As Profile", "Profile name:", parent=self)
+        if not name:
+            return
+
+        self.active_profile = name.strip()
+        self._profile_version = None
+        self._save_active_profile()
+        self.set_status_message(f"Profile '{self.active_profile}' saved")
+
+    def switch_profile(self, name):
+        self._save_active_profile()
+        try:
+            mask = self._profiles().owned_mask(name, self.df)
+        except Exception as e:
+            self.set_status_message(f"Failed to load profile: {e}")
+            return
+
+        self._update_df_and_inventory(Inventory.from_mask(mask))
+        self.active_profile = name
+        self._profile_version = self.inventory.version
+        self.set_status_message(f"Switched to profile '{name}'")
+
+    def show_profile_picker(self):
+        profiles = self._profiles().profiles()
+        if profiles.is_empty():
+            self.set_status_message("No profiles saved yet")
+            return
+
+        top = tk.Toplevel(self)
+        top.title("Switch Profile")
+        listbox = tk.Listbox(top, height=min(15, profiles.height))
+        listbox.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+        names = profiles["name"].to_list()
+        for name, owned in zip(names, profiles["owned"].to_list()):
+            listbox.insert(tk.END, f"{name} ({owned} cards)")
+
+        def pick(event=None):
+            selection = listbox.curselection()
+            if selection:
+                top.destroy()
+                self.switch_profile(names[selection[0]])
+
+        listbox.bind("<Double-Button-1>", pick)
+        tk.Button(top, text="Switch", command=pick).pack(pady=(0, 10))
+
+    def show_profiles_overview(self):
+        self._save_active_profile()
+        completion = self.inventory_manager.profile_completion(
+            self._profiles(), is_set=self.is_set
+        )
+
+        top = tk.Toplevel(self)
+        top.title("Profiles Overview")
+        columns = ("profile", "set_code", "owned", "total")
+        tree = ttk.Treeview(top, columns=columns, show="headings", height=15)
+        for col in columns:
+            tree.heading(col, text=col.replace("_", " ").title())
+            tree.column(col, width=120, anchor="center")
+        for profile, set_code, total, owned in completion.select(
+            "profile", "set_code", "total", "owned"
+        ).iter_rows():
+            tree.insert("", tk.END, values=(profile, set_code, owned, total))
+        tree.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+
+    ## ACROSS SETS
+
+    def _owned_ids(self) -> pl.Series:
+        """Ids of owned cards: the open inventory plus the active profile's cards in other sets."""
+
+        ids = self.df["id"].cast(pl.String).filter(pl.Series(self.inventory.mask[:self.df.height]))
+        if self.active_profile is not None:
+            self._save_active_profile()
+            ids = pl.concat([ids, self._profiles().owned_ids(self.active_profile)["id"].cast(pl.String)])
+        return ids
+
+    def missing_across_sets(self, rarity) -> pl.DataFrame:
+        cards = self.catalog.sets()
+        mask = cards["id"].cast(pl.String).is_in(self._owned_ids()).to_numpy()
+        return self.catalog.query(mask=mask, owned=False, rarity=rarity)
+
+    def show_missing_across_sets(self):
+        rarity = simpledialog.askstring(
+            "Missing Across Sets", "Rarity:", initialvalue="Rare EX", parent=self
+        )
+        if not rarity:
+            return
+
+        try:
+            missing = self.missing_across_sets(rarity.strip())
+        except Exception as e:
+            self.set_status_message(f"Failed to query sets: {e}")
+            return
+
+        top = tk.Toplevel(self)
+        top.title(f"Missing {rarity.strip()} ({missing.height})")
+        columns = ("id", "name", "set", "pack")
+        tree = ttk.Treeview(top, columns=columns, show="headings", height=15)
+        for col in columns:
+            tree.heading(col, text=col.title())
+            tree.column(col, width=140, anchor="center")
+        for values in missing.select(
+            [pl.col(col).cast(pl.String).fill_null("") for col in columns]
+        ).iter_rows():
+            tree.insert("", tk.END, values=values)
+        tree.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+
     ## WIDGETS
 
     def _create_widgets(self):
         style = ttk.Style(self)
-        style.configure("Treeview", font=("Arial", 12))
+        style.configure("Treeview", font=("Arial", 12), rowheight=24)
         style.configure("Treeview.Heading", font=("Arial", 12))
 
         self._create_top_frame()
@@ -280,8 +616,7 @@ class CollectionViewer(tk.Tk):
                 col, width=min(longest_width * 20, 150), anchor="center", stretch=False
             )
 
-        v_scrollbar = ttk.Scrollbar(tree_frame, orient="vertical", command=tree.yview)
-        tree.configure(yscroll=v_scrollbar.set)  # type: ignore
+        v_scrollbar = ttk.Scrollbar(tree_frame, orient="vertical")
 
         h_scrollbar = ttk.Scrollbar(tree_frame, orient="horizontal", command=tree.xview)
         tree.configure(xscroll=h_scrollbar.set)  # type: ignore
@@ -290,10 +625,12 @@ class CollectionViewer(tk.Tk):
         v_scrollbar.grid(row=0, column=1, sticky="ns")
         h_scrollbar.grid(row=1, column=0, sticky="ew")
 
-        tree.bind("<<TreeviewSelect>>", lambda event: self.on_item_select(event))
         tree.bind("<Button-1>", self.on_tree_click)
 
         self.tree = tree
+        self.tree_view = VirtualTree(
+            tree, v_scrollbar, self._tree_row_values, on_select=self.on_item_select
+        )
 
         right_frame = tk.Frame(main_frame, width=500)
         right_frame.pack(side=tk.RIGHT, fill=tk.BOTH, padx=(5, 0))
@@ -301,6 +638,10 @@ class CollectionViewer(tk.Tk):
 
         right_notebook = ttk.Notebook(right_frame)
         right_notebook.pack(fill=tk.BOTH, expand=True)
+        right_notebook.bind(
+            "<<NotebookTabChanged>>", lambda e: self.refresh_scheduler.flush()
+        )
+        self.right_notebook = right_notebook
 
         image_tab = tk.Frame(right_notebook, width=500, height=420)
         right_notebook.add(image_tab, text="Image Display")
@@ -327,6 +668,8 @@ class CollectionViewer(tk.Tk):
         chart_frame.pack(fill=tk.BOTH, expand=True, pady=5)
         chart_frame.pack_propagate(False)
 
+        self.graph_tab = graph_tab
+
         self.chart_frame = chart_frame
         self.chart_canvas = None
 
@@ -478,174 +821,98 @@ class CollectionViewer(tk.Tk):
         set_df = ensure_row_index(set_df)
         self.set = set(set_df["row_idx"].to_list())
         if not self.is_set:
-            self._show_tree(self.tree, df)
+            self._show_tree(df)
         else:
-            self._show_tree(self.tree, set_df)
+            self._show_tree(set_df)
         self.groups = None
-        self.update_inventory_counter()
-        self.show_group_bar_chart()
-        self.update_pack_suggestion()
-        self._update_set_completion()
-
-    def _show_tree(self, tree, df):
-        tree.delete(*tree.get_children())
-
-        # Initialize checkbox_vars dictionaries
-        if not hasattr(self, "checkbox_vars_all"):
-            self.checkbox_vars_all = {}
-            self.checkbox_vars_set = {}
-
-        checkbox_vars = (
-            self.checkbox_vars_set if self.is_set else self.checkbox_vars_all
-        )
-        checkbox_vars.clear()
+        self.refresh_panels()
 
+    def _show_tree(self, df):
         df = ensure_row_index(df)
-        in_inventory = df["row_idx"].is_in(list(self.inventory))
-
-        # Efficiently create 'checked' and 'unchecked' data
-        checked_data = df.filter(in_inventory)
-        unchecked_data = df.filter(~in_inventory)
-
-        # Insert group headings
-        checked_group_id = tree.insert(
-            "",
-            tk.END,
-            values=["", "Checked"] + [""] * (len(df.columns) - 1),
-            tags=("checked_group",),
-        )
-        unchecked_group_id = tree.insert(
-            "",
-            tk.END,
-            values=["", "Unchecked"] + [""] * (len(df.columns) - 1),
-            tags=("unchecked_group",),
-        )
+        in_inventory = self.inventory.owned(df)
+        rows = df["row_idx"]
 
-        # Insert checked and unchecked items
-        for row in checked_data.iter_rows(named=True):
-            values = ["☑"] + [row[col] for col in df.columns if col != "row_idx"]
-            item_id = tree.insert(
-                checked_group_id, tk.END, values=values, tags=("item",)
-            )
-            checkbox_vars[item_id] = tk.IntVar(value=1)
-            tree.set(item_id, "Inventory", "☑")
+        self.tree_view.set_groups(
+            [
+                ("Checked", self._group_values("Checked"), rows.filter(in_inventory), False),
+                ("Unchecked", self._group_values("Unchecked"), rows.filter(~in_inventory), False),
+            ]
+        )
 
-        for row in unchecked_data.iter_rows(named=True):
-            values = ["☐"] + [row[col] for col in df.columns if col != "row_idx"]
-            item_id = tree.insert(
-                unchecked_group_id, tk.END, values=values, tags=("item",)
-            )
-            checkbox_vars[item_id] = tk.IntVar(value=0)
-            tree.set(item_id, "Inventory", "☐")
+    def _group_values(self, label):
+        return ["", label] + [""] * (len(self.df.columns) - 1)
 
-    def _populate_tree(self, tree, grouped_data, checkbox_vars, open_groups=True):
-        tree.delete(*tree.get_children())
-        checkbox_vars.clear()
+    def _tree_row_values(self, idx):
+        return ["☑" if idx in self.inventory else "☐"] + list(self.df.row(idx))
 
-        groups = {}  # Store group IDs for later use
+    def _populate_tree(self, grouped_data, open_groups=False):
+        groups = {}  # Store group DataFrames by group key
+        tree_groups = []
 
         for name, group in grouped_data:
+            key = name[0] if isinstance(name, tuple) else name
+            key = "None" if key is None else key
             group = ensure_row_index(group)
-            groups[name] = group  # Store group DataFrame
-            group_owned = group.filter(pl.col("row_idx").is_in(self.inventory))
+            groups[key] = group
+            group_owned = self.inventory.count(group["row_idx"])
             group_total = len(group)
-            group_display = f"{name[0]} ({group_owned.height}/{group_total})"
-            values = ["", group_display] + [""] * (len(self.df.columns) - 1)
-            group_id = tree.insert(
-                "",
-                tk.END,
-                text=f"Group: {name}",
-                values=values,
-                open=open_groups,
-                tags=("group",),
+            group_display = f"{key} ({group_owned}/{group_total})"
+            tree_groups.append(
+                (key, self._group_values(group_display), group["row_idx"], open_groups)
             )
-            groups[group_id] = group  # Store group_id: group mapping
 
-        return groups  # Return the groups dictionary
+        self.tree_view.set_groups(tree_groups)
+
+        return groups
 
     def on_group_change(self, value):
-        # Common operations
-        self.groups = self.groups_all = {}  # Initialize/Clear groups
-        self.groups_set = {}
-        self.checkbox_vars_all = {}
-        self.checkbox_vars_set = {}
         df = get_set_df(self.df) if self.is_set else self.df
         df = ensure_row_index(df)
 
         if value == "Checked":
             # Group by checked/unchecked
+            owned = self.inventory.owned(df)
             groups = {
-                "Checked": df.filter(pl.col("row_idx").is_in(list(self.inventory))),
-                "Unchecked": df.filter(~pl.col("row_idx").is_in(list(self.inventory))),
+                "Checked": df.filter(owned),
+                "Unchecked": df.filter(~owned),
             }
-            self.groups_all = self._populate_tree(
-                self.tree, groups, self.checkbox_vars_all
-            )
+            self.groups = self._populate_tree(groups.items())
 
         else:
-            # Group by selected column
-            grouped = df.group_by(value)
-            self.groups_all = self._populate_tree(
-                self.tree, grouped, self.checkbox_vars_all
-            )
-
-            set_df = get_set_df(df)
-            self.groups_set = set_df.group_by(value)
+            # Group by selected column, in a stable order so the headers stay put
+            self.groups = self._populate_tree(df.group_by(value, maintain_order=True))
 
-        self.groups = self.groups_all  # Set self.groups after populating
-        self.update_inventory_counter()
-        self.show_group_bar_chart()
-        self.update_pack_suggestion()
+        self.refresh_panels()
 
-    def on_item_select(self, event=None):
-        widget = event.widget  # type: ignore
-        selected = widget.selection()
-
-        if not selected:
-            return
+    def on_item_select(self, item_id):
+        group_key = self.tree_view.group_of(item_id)
 
-        item_id = selected[0]
-
-        if widget == self.tree:
-            groups = self.groups_all
-        else:
-            return
-
-        if groups and item_id in groups:
-            self.handle_group_selection(item_id, widget, groups)
+        if group_key is not None:
+            self.handle_group_selection(group_key)
         else:
             self.handle_item_selection()
 
-        idx = self.get_df_index_from_tree_item(item_id, widget)
+        idx = self.get_df_index_from_tree_item(item_id, self.tree)
 
         if idx is not None:
-            self.display_card_image(idx, widget)
+            self.display_card_image(idx, self.tree)
 
-    def handle_group_selection(self, item_id, tree_widget, groups):
-        group_df = groups[item_id]
+        self._prefetch_neighbors()
 
-        if not tree_widget.get_children(item_id):
-            self.expand_group(item_id, group_df, tree_widget)
-        else:
-            self.collapse_group(item_id, tree_widget)
+    def _prefetch_neighbors(self, count=8):
+        """Decode the images around the selection in the background, in tree order."""
 
-        self.current_group = group_df
-        self.update_inventory_counter()
-
-    def expand_group(self, item_id, group_df, tree_widget):
-        for row in group_df.iter_rows(named=True):
-            idx = row["row_idx"]
-            inv = 1 if idx in self.inventory else 0
-            values = ["☑" if inv else "☐"] + [row[col] for col in self.df.columns]
-            tree_widget.insert(item_id, tk.END, values=values, tags=("item",))
+        rows = self.tree_view.rows_around_selection(count)
+        self.prefetcher.prefetch(
+            (self._image_path_of_row(idx), idx in self.inventory) for idx in rows
+        )
 
-    def collapse_group(self, item_id, tree_widget):
-        for child in tree_widget.get_children(item_id):
-            tree_widget.delete(child)
+    def handle_group_selection(self, group_key):
+        self.tree_view.toggle_group(group_key)
+        self.current_group = self.groups.get(group_key) if self.groups else None
 
     def handle_item_selection(self):
         self.current_group = None
-        self.update_inventory_counter()
 
     def on_tree_click(self, event):
         widget = event.widget
@@ -669,55 +936,65 @@ class CollectionViewer(tk.Tk):
         if idx is None:
             return
 
-        if idx in self.inventory:
-            self.inventory.remove(idx)
-            widget.set(item_id, "Inventory", "☐")
-        else:
-            self.inventory.add(idx)
-            widget.set(item_id, "Inventory", "☑")
-
-        if self.groups and widget == self.tree:
-            parent_id = widget.parent(item_id)
-
-            if parent_id in self.groups:
-                group_df = self.groups[parent_id]
-                group_owned = sum(i in self.inventory for i in group_df["row_idx"])
-                group_total = len(group_df)
-                group_col = self.group_var.get()
-                group_name = group_df[group_col][0]
-                group_display = f"{group_name} ({group_owned}/{group_total})"
-                values = widget.item(parent_id, "values")
-                new_values = list(values)
-                new_values[1] = group_display
-                widget.item(parent_id, values=new_values)
-
-        self._update_set_completion()
-        self.update_inventory_counter()
-        self.show_group_bar_chart()
-        self.update_pack_suggestion()
+        owned = self.inventory_manager.toggle(idx)
+        self.journal.record(self.df["id"][idx], owned)
+
+        group_key = self.tree_view.parent_of(item_id)
+        if self.groups and group_key in self.groups:
+            group_df = self.groups[group_key]
+            group_col = self.group_var.get()
+
+            if group_col in self.df.columns:
+                group_owned, group_total = self.inventory_manager.stats.label_counts(
+                    group_col, group_key, self.is_set
+                )
+            else:
+                group_owned = self.inventory.count(group_df["row_idx"])
+                group_total = group_df.height
+
+            group_display = f"{group_key} ({group_owned}/{group_total})"
+            self.tree_view.set_group_values(group_key, self._group_values(group_display))
+
+        self.tree_view.refresh()
+        self.refresh_panels()
 
     def get_df_index_from_tree_item(self, item_id, tree_widget=None):
         if tree_widget is None:
             tree_widget = self.tree
 
+        idx = self.tree_view.row_of(item_id)
+        if idx is not None:
+            return idx
+
         try:
             item_values = tree_widget.item(item_id, "values")
             selected_id = item_values[self.df.columns.index("id") + 1]
-
-            df = ensure_row_index(self.df)
-            df_match = df.filter(pl.col("id").cast(str) == str(selected_id))
-            if df_match.height > 0:
-                return df_match[0, "row_idx"]
+            return self.inventory_manager.row_of_card(selected_id)
         except Exception as e:
             self.set_status_message(e)
 
         return None
 
     def update_inventory_counter(self):
-        # self._update_set_completion()
         self._update_inventory_count()
         self._update_inventory_by_pack()
-        self.update_pack_suggestion()
+
+    ## REFRESH
+
+    def _create_refresh_scheduler(self):
+        self.refresh_scheduler = RefreshScheduler(self, delay=30)
+        self.refresh_scheduler.register("set", self._update_set_completion)
+        self.refresh_scheduler.register("inventory", self.update_inventory_counter)
+        self.refresh_scheduler.register(
+            "chart", self.show_group_bar_chart, is_visible=self._is_chart_visible
+        )
+        self.refresh_scheduler.register("suggestion", self.update_pack_suggestion)
+
+    def _is_chart_visible(self):
+        return self.right_notebook.select() == str(self.graph_tab)
+
+    def refresh_panels(self, *panels):
+        self.refresh_scheduler.mark(*panels)
 
     ## BAR GRAPH
     def show_group_bar_chart(self):
@@ -727,61 +1004,66 @@ class CollectionViewer(tk.Tk):
             self.chart_manager.clear_chart()
             return
 
-        df = get_set_df(self.df) if self.is_set else self.df
-
-        if group_col not in df.columns:
+        if group_col not in self.df.columns:
             self.chart_manager.clear_chart()
             return
 
-        df = ensure_row_index(df).fill_null("None")
-        owned_mask = df.filter(pl.col("row_idx").is_in(list(self.inventory)))
-        group_counts = df.group_by(group_col).len().rename({"len": "total"})
-        owned_counts = owned_mask.group_by(group_col).len().rename({"len": "owned"})
-
-        joined = (
-            group_counts.join(owned_counts, on=group_col, how="left")
-            .with_columns(
-                [
-                    pl.col("owned").fill_null(0),
-                    (pl.col("total") - pl.col("owned").fill_null(0)).alias("missing"),
-                ]
-            )
-            .with_columns(
-                [
-                    (pl.col("owned") / pl.col("total") * 100).alias("owned_pct"),
-                    (pl.col("missing") / pl.col("total") * 100).alias("missing_pct"),
-                ]
+        cache_key = (group_col, self.is_set, self.inventory.version)
+        chart_data = self.chart_cache.get(cache_key)
+        if chart_data is not None:
+            self.chart_manager.bar_chart(*chart_data, cache_key=cache_key)
+            return
+
+        stats = self.inventory_manager.stats
+        if not stats.is_tracked(group_col):
+            self.executor.submit(
+                "chart",
+                stats.encode,
+                group_col,
+                on_done=lambda encoded: self._on_chart_encoded(stats, group_col, encoded),
+                on_error=lambda e: self.set_status_message(f"Failed to build chart: {e}"),
             )
-            .sort(group_col)
-        )
+            return
+
+        self.executor.cancel("chart")
+        group_counts = stats.group_counts(group_col, self.is_set)
+        if not group_counts:
+            self.chart_manager.clear_chart()
+            return
 
+        names = [name for name, _, _ in group_counts]
         labels = (
-            joined[group_col].to_list()
+            names
             if group_col != "set"
-            else re.findall(r"\((.*?)\)", joined[group_col].to_list()[0])
+            else re.findall(r"\((.*?)\)", names[0])
         )
-        owned_pct = joined["owned_pct"].to_list()
-        missing_pct = joined["missing_pct"].to_list()
+        owned_pct = [owned / total * 100 for _, owned, total in group_counts]
+        missing_pct = [(total - owned) / total * 100 for _, owned, total in group_counts]
+        self.chart_cache.put(cache_key, (labels, owned_pct, missing_pct))
         self.chart_manager.bar_chart(
-            labels, owned_pct=owned_pct, missing_pct=missing_pct
+            labels, owned_pct=owned_pct, missing_pct=missing_pct, cache_key=cache_key
         )
 
+    def _on_chart_encoded(self, stats, group_col, encoded):
+        if stats is not self.inventory_manager.stats:
+            return
+
+        stats.adopt((group_col,), *encoded)
+        self.refresh_panels("chart")
+
     ## UPDATE COMPLETION
     def _update_set_completion(self):
-        df = get_set_df(ensure_row_index(self.df))
-        self.inventory_manager.df = df
-        self.inventory_manager.inventory = self.inventory
         set_total, set_owned, set_missing = self.inventory_manager._update_completion(
-            df
+            is_set=True
         )
         self.set_comp_label.config(
             text=f"Minimum Set Completion: {set_owned} / {set_total} (missing: {set_missing})"
         )
-        self._update_set_pack_completion(df)
+        self._update_set_pack_completion()
 
-    def update_completion(self, df_c: pl.DataFrame, is_set: bool):
+    def update_completion(self, is_set: bool):
         joined_rows, color = self.inventory_manager.update_completion(
-            df_c, is_set, self.pack_display_order
+            is_set, self.pack_display_order
         )
 
         for row in joined_rows:
@@ -806,11 +1088,11 @@ class CollectionViewer(tk.Tk):
                 )
             lbl.pack(side=tk.TOP, anchor="w", fill=tk.X, padx=2, pady=1)
 
-    def _update_set_pack_completion(self, set_df: pl.DataFrame):
+    def _update_set_pack_completion(self):
         for widget in self.set_pack_completion_frame.winfo_children():
             widget.destroy()
 
-        if "pack" not in set_df.columns:
+        if "pack" not in self.df.columns:
             lbl = tk.Label(
                 self.set_pack_completion_frame,
                 text="No pack data available",
@@ -819,7 +1101,7 @@ class CollectionViewer(tk.Tk):
             lbl.pack(side=tk.TOP, anchor="w", fill=tk.X, padx=2, pady=1)
             return
 
-        self.update_completion(df_c=set_df, is_set=True)
+        self.update_completion(is_set=True)
 
     def _update_inventory_count(self):
         total, owned, missing = self.inventory_manager._update_count()
@@ -840,36 +1122,40 @@ class CollectionViewer(tk.Tk):
             lbl.pack(side=tk.TOP, anchor="w", fill=tk.X, padx=2, pady=1)
             return
 
-        self.update_completion(df_c=self.df, is_set=False)
+        self.update_completion(is_set=False)
 
     def update_pack_suggestion(self):
-        self.inventory_manager.df = self.df
-        self.inventory_manager.inventory = self.inventory
         packs = self.inventory_manager._get_incomplete_packs(self.is_set)
 
         if not packs:
+            self.executor.cancel("suggestion")
             self._set_suggest_label("Congratulations! All packs are complete.")
             return
 
         if "pack" not in self.df.columns or "rarity" not in self.df.columns:
+            self.executor.cancel("suggestion")
             self._set_suggest_label("Pack or rarity data missing.")
             return
 
         missing_cards = self.inventory_manager._update_suggestion(self.is_set)
-        prob_matrix = logic.calc_prob(current_set=self.df["set"].unique()[0])
-        pack_probs = self.inventory_manager._calculate_pack_probabilities(
-            packs, missing_cards, prob_matrix
+        complete = self.inventory_manager._update_count()[2] == 0
+        is_set = self.is_set
+        self.executor.submit(
+            "suggestion",
+            self.inventory_manager.pack_suggestion,
+            packs,
+            missing_cards,
+            self.df["set"].unique()[0],
+            complete,
+            on_done=lambda text: self._set_suggest_label(text, is_set),
+            on_error=lambda e: self._set_suggest_label(f"Suggestion failed: {e}", is_set),
         )
 
-        if not pack_probs:
-            self._set_suggest_label("No probability data available.")
-            return
-
-        suggestion = self.inventory_manager._display_pack_suggestion(pack_probs)
-        self._set_suggest_label(suggestion.strip())
+    def _set_suggest_label(self, text, is_set=None):
+        if is_set is None:
+            is_set = self.is_set
 
-    def _set_suggest_label(self, text):
-        if self.is_set:
+        if is_set:
             self.suggest_label_set.config(text=text)
             self.suggest_label.config(text="")  # hide the other
         else:
@@ -878,76 +1164,95 @@ class CollectionViewer(tk.Tk):
 
     ## DISPLAY AND DOWNLOAD
 
-    def _download_all_set_images_with_progress(self, progress_var, progress_label, top):
-        """Downloads all card images from JSON files in the 'sets' folder and updates the progress bar."""
+    def _download_jobs(self):
+        """Collects (name, id, set, rarity, path) for every card; the downloader's per-set
+        manifest decides which ones need a request."""
 
         no_cap_sets, all_sets = self._get_local_set_names(
             folder=self.sets_folder
         )  # Get sets from 'sets' folder
-        total_cards = 0
-        for set_name in no_cap_sets:
-            json_path = os.path.join(self.sets_folder, f"{set_name}.json")
-            try:
-                with open(json_path, "r", encoding="utf-8") as f:
-                    set_data = json.load(f)
-                total_cards += len(set_data)  # Assuming set_data is a list of cards
-            except FileNotFoundError:
-                print(f"Warning: JSON file not found for set '{set_name}'")
-            except json.JSONDecodeError:
-                print(f"Warning: Invalid JSON in file for set '{set_name}'")
+        jobs = []
 
-        downloaded_cards = 0
+        try:
+            # Read every set in one pass; each partition below is then a slice.
+            self.catalog.sets()
+        except Exception:
+            pass
 
         for json_name, set_name in zip(no_cap_sets, all_sets):
             set_folder = os.path.join(self.local_image_folder, set_name)
             os.makedirs(set_folder, exist_ok=True)
-            json_path = os.path.join(self.sets_folder, f"{json_name}.json")
 
             try:
-                with open(json_path, "r", encoding="utf-8") as f:
-                    set_data = json.load(f)
-                set_df = pl.DataFrame(set_data)  # Create DataFrame from JSON data
-
-                for row in set_df.iter_rows(named=True):
-                    card_name = row.get("name", "").replace(" ", "_")
-                    card_id = row.get("id", "").split("-")[1].lstrip("0")
-                    card_rarity = row.get("rarity", "").replace(" ", "_")
-
-                    filename = f"{card_name}_{card_id}_{card_rarity}.png"
-                    local_path = os.path.join(set_folder, filename)
-
-                    if not os.path.exists(local_path):
-                        url = img_aqcuisition.get_image(
-                            card_name=card_name,
-                            card_id=card_id,
-                            set_name=set_name,
-                            card_rarity=card_rarity,
-                        )
-                        if url:
-                            try:
-                                response = requests.get(url, stream=True, timeout=10)
-                                response.raise_for_status()
-                                with open(local_path, "wb") as f:
-                                    for chunk in response.iter_content(chunk_size=8192):
-                                        f.write(chunk)
-                            except requests.exceptions.RequestException as e:
-                                print(f"Error downloading {card_name} from {url}: {e}")
-                        else:
-                            print(f"URL not found for {card_name} in {set_name}")
-
-                    downloaded_cards += 1
-                    progress = (downloaded_cards / total_cards) * 100
-                    progress_var.set(progress)
-                    progress_label.config(text=f"Downloading... ({int(progress)}%)")
-                    top.update()
-
-            except FileNotFoundError:
+                cards = self.catalog.partition(catalog.set_code(json_name))
+            except KeyError:
                 print(f"Warning: JSON file not found for set '{set_name}'")
-            except json.JSONDecodeError:
+                continue
+            except Exception:
                 print(f"Warning: Invalid JSON in file for set '{set_name}'")
+                continue
+
+            rows = cards.select(
+                [pl.col(col).cast(pl.String).fill_null("") for col in ("name", "id", "rarity")]
+            ).iter_rows()
+            for name, id, rarity in rows:
+                card_name = name.replace(" ", "_")
+                card_id = id.split("-")[1].lstrip("0")
+                card_rarity = rarity.replace(" ", "_")
+
+                filename = f"{card_name}_{card_id}_{card_rarity}.png"
+                local_path = os.path.join(set_folder, filename)
+
+                jobs.append((card_name, card_id, set_name, card_rarity, local_path))
+
+        return jobs
+
+    def _download_all_set_images_with_progress(self, downloader, progress_queue):
+        """Downloads new or changed card images; runs off the Tk thread and only reports through the queue."""
+
+        jobs = self._download_jobs()
+        progress_queue.put(("start", len(jobs)))
+
+        def report(done, total, job, status):
+            if status in ("not found", "failed") or status.startswith("failed:"):
+                print(f"Could not download {job[0]} in {job[2]}: {status}")
+            progress_queue.put(("progress", done, total))
+
+        try:
+            downloader.run(jobs, progress=report)
+        finally:
+            downloader.close()
+            # Archives may have been rebuilt meanwhile; lookups reopen them.
+            self.image_archives.refresh()
+            if self.downloader is downloader:
+                self.downloader = None
+            progress_queue.put(("done",))
+
+    def _poll_download_progress(self, progress_queue, progress_var, progress_label, top):
+        """Applies queued progress messages to the dialog from the Tk thread."""
+
+        if not top.winfo_exists():
+            return
+
+        try:
+            while True:
+                message = progress_queue.get_nowait()
+                if message[0] == "start" and message[1] == 0:
+                    progress_var.set(100)
+                elif message[0] == "progress":
+                    _, done, total = message
+                    progress = (done / total) * 100
+                    progress_var.set(progress)
+                    progress_label.config(text=f"Downloading... ({int(progress)}%)")
+                elif message[0] == "done":
+                    progress_label.config(text="Download Complete!")
+                    top.after(1000, top.destroy)
+                    return
+        except queue.Empty:
+            pass
 
-        progress_label.config(text="Download Complete!")
-        top.after(1000, top.destroy)
+        top.after(100, self._poll_download_progress,
+                  progress_queue, progress_var, progress_label, top)
 
     def _get_local_set_names(self, folder):
         """Gets a list of set names from the specified folder (e.g., 'sets' or 'img')."""
@@ -976,48 +1281,15 @@ class CollectionViewer(tk.Tk):
 
         return set_names, set_cap
 
-    def _load_local_image(self, card_name, card_id, set_name, card_rarity):
-        """Loads an image from the local folder if it exists and returns both PIL Image and PhotoImage."""
+    def _card_image_path(self, card_name, card_id, set_name, card_rarity):
+        """Path of a card's image inside the local 'img' folder, whether or not it is packed in the set's archive."""
 
         set_folder = os.path.join(self.local_image_folder, set_name)
         filename = f"{card_name.replace(' ', '_')}_{card_id}_{card_rarity.replace(' ', '_')}.png"
-        local_path = os.path.join(set_folder, filename)
+        return os.path.join(set_folder, filename)
 
-        if os.path.exists(local_path):
-            try:
-                pil_image = Image.open(local_path)
-                original_width, original_height = pil_image.size
-
-                # Calculate scaling factors
-                container_width, container_height = 480, 420
-                width_scale = container_width / original_width
-                height_scale = container_height / original_height
-                scale = min(width_scale, height_scale)  # Use the smaller scale
-
-                # Calculate new dimensions
-                new_width = int(original_width * scale)
-                new_height = int(original_height * scale)
-
-                resized_image = pil_image.resize(
-                    (new_width, new_height), Image.Resampling.LANCZOS
-                )
-                photo_image = ImageTk.PhotoImage(resized_image)
-                return pil_image, photo_image
-            except Exception as e:
-                print(f"Error loading local image {local_path}: {e}")
-                return None, None
-        return None, None
-
-    def display_card_image(self, idx, widget):
-        # Ensure DataFrame has row_idx
-        df = ensure_row_index(self.df)
-
-        # Get the row by index
-        match = df.filter(pl.col("row_idx") == idx)
-        if match.is_empty():
-            return
-
-        row = match[0]
+    def _image_path_of_row(self, idx):
+        row = self.df.row(idx, named=True)
         # Extract values
         card_name = safe_str(row["name"])
         card_id = safe_str(row["id"])
@@ -1027,36 +1299,22 @@ class CollectionViewer(tk.Tk):
         if "-" in card_id:
             card_id = card_id.split("-")[1].lstrip("0")
 
-        # Get the correct label depending on which tree was clicked
-        label = self.img_label
-
-        label.config(image="", text="Loading image...")
+        return self._card_image_path(card_name, card_id, set_name, card_rarity)
 
-        pil_image, photo = self._load_local_image(
-            card_name, card_id, set_name, card_rarity
-        )
-
-        if pil_image:
-            # Resize to fit container
-            container_width, container_height = 480, 420
-            original_width, original_height = pil_image.size
-            scale = min(
-                container_width / original_width, container_height / original_height
-            )
-            new_size = (int(original_width * scale), int(original_height * scale))
-            image = pil_image.resize(new_size, Image.Resampling.LANCZOS)
+    def display_card_image(self, idx, widget):
+        if not 0 <= idx < self.df.height:
+            return
 
-            if idx not in self.inventory:
-                # Grayscale version for unowned
-                image = pil_image.convert("L").resize(
-                    new_size, Image.Resampling.LANCZOS
-                )
+        # Get the correct label depending on which tree was clicked
+        label = self.img_label
 
-            photo = ImageTk.PhotoImage(image)
+        photo = self.thumbnails.photo(self._image_path_of_row(idx), idx in self.inventory)
 
+        if photo:
             label.config(image=photo, text="", compound="center")
         else:
             label.config(image="", text="Image not available locally")
+        label.image = photo  # Tk does not keep its own reference
 
     def _show_download_progress(self):
         """Shows a message box with a progress bar during image download."""
@@ -1068,9 +1326,27 @@ class CollectionViewer(tk.Tk):
         progress_label = tk.Label(top, text="Downloading...")
         progress_label.pack(pady=5)
 
+        # requests and BeautifulSoup are only needed once a download starts.
+        from src.downloader import ImageDownloader
+
+        progress_queue = queue.Queue()
+        if self.downloader is not None:
+            self.downloader.cancel()
+        downloader = ImageDownloader(
+            on_downloaded=self.thumbnails.generate, archives=self.image_archives
+        )
+        self.downloader = downloader
+
+        def on_close():
+            downloader.cancel()
+            top.destroy()
+
+        top.protocol("WM_DELETE_WINDOW", on_close)
+
         self.download_thread = threading.Thread(
             target=self._download_all_set_images_with_progress,
-            args=(progress_var, progress_label, top),
+            args=(downloader, progress_queue),
             daemon=True,
         )
         self.download_thread.start()
+        self._poll_download_progress(progress_queue, progress_var, progress_label, top)
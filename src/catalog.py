@@ -0,0 +1,241 @@
+from src.logic import _TYPE_CARDS
+from src.utils import resource_path, ensure_row_index
+import json
+import ntpath
+import os
+import threading
+import polars as pl
+
+CATALOG_SCHEMA = {
+    "id": pl.String,
+    "name": pl.String,
+    "element": pl.String,
+    "type": pl.String,
+    "subtype": pl.String,
+    "set": pl.String,
+    "pack": pl.String,
+    "rarity": pl.String,
+}
+
+CATALOG_DTYPES = {
+    "rarity": pl.Enum(_TYPE_CARDS),
+    "pack": pl.Categorical,
+    "element": pl.Categorical,
+    "type": pl.Categorical,
+    "set": pl.Categorical,
+}
+
+
+def cache_path(json_path) -> str:
+    return os.path.splitext(str(json_path))[0] + ".arrow"
+
+
+def stamp_path(cache_file) -> str:
+    return cache_file + ".src"
+
+
+def source_stamp(json_path):
+    stat = os.stat(json_path)
+    return [stat.st_mtime_ns, stat.st_size]
+
+
+def is_stale(json_path, cache_file) -> bool:
+    """True unless the cache was compiled from the JSON as it is now (same mtime and size)."""
+
+    if not os.path.exists(cache_file):
+        return True
+    try:
+        with open(stamp_path(cache_file), "r", encoding="utf-8") as f:
+            return json.load(f) != source_stamp(json_path)
+    except (OSError, ValueError):
+        return True
+
+
+_reported_rarities = set()
+
+
+def rarity_dtype(rarities: pl.Series) -> pl.Enum:
+    """The known rarities in their usual order, then any others the catalog uses."""
+
+    extras = sorted(set(rarities.cast(pl.String).drop_nulls().unique().to_list()) - set(_TYPE_CARDS))
+    unreported = [rarity for rarity in extras if rarity not in _reported_rarities]
+    if unreported:
+        _reported_rarities.update(unreported)
+        print(f"Warning: unknown rarities {', '.join(unreported)}; they are sorted after the known ones")
+    return pl.Enum(_TYPE_CARDS + extras)
+
+
+def apply_schema(df: pl.DataFrame) -> pl.DataFrame:
+    dtypes = dict(CATALOG_DTYPES)
+    if "rarity" in df.columns:
+        dtypes["rarity"] = rarity_dtype(df["rarity"])
+
+    return df.with_columns([
+        pl.col(col).cast(dtype)
+        for col, dtype in dtypes.items()
+        if col in df.columns and df[col].dtype != dtype
+    ])
+
+
+def concat_sets(frames) -> pl.DataFrame:
+    frames = [
+        df.with_columns([pl.col(col).cast(pl.String) for col in CATALOG_DTYPES if col in df.columns])
+        for df in frames
+    ]
+    return apply_schema(pl.concat(frames, how="vertical"))
+
+
+def compile_set(json_path) -> pl.DataFrame:
+    """Parse a set JSON keeping only the tracker columns and store it as Arrow IPC next to it."""
+
+    # Stamped before reading, so a write during the parse leaves the cache stale.
+    stamp = source_stamp(json_path)
+    df = apply_schema(pl.read_json(json_path, schema=CATALOG_SCHEMA))
+    cache_file = cache_path(json_path)
+    tmp_file = cache_file + ".tmp"
+
+    try:
+        if os.path.exists(stamp_path(cache_file)):
+            os.remove(stamp_path(cache_file))
+        df.write_ipc(tmp_file, compression="uncompressed")
+        os.replace(tmp_file, cache_file)
+        with open(tmp_file, "w", encoding="utf-8") as f:
+            json.dump(stamp, f)
+        os.replace(tmp_file, stamp_path(cache_file))
+    except OSError:
+        if os.path.exists(tmp_file):
+            os.remove(tmp_file)
+
+    return df
+
+
+def load_set(json_path) -> pl.DataFrame:
+    json_path = resource_path(str(json_path))
+    cache_file = cache_path(json_path)
+
+    if is_stale(json_path, cache_file):
+        return compile_set(json_path)
+
+    try:
+        # Memory-mapped by default; the keyword itself is gone in newer polars.
+        return apply_schema(pl.read_ipc(cache_file))
+    except Exception:
+        return compile_set(json_path)
+
+
+def set_code(json_path) -> str:
+    """Partition key of a set file, e.g. "a3" for sets/a3-celestial-guardians.json."""
+
+    # ntpath splits on both separators, so Windows paths saved in old files work anywhere.
+    return ntpath.basename(str(json_path)).split("-", 1)[0].split(".", 1)[0].lower()
+
+
+class Catalog:
+    """Every set JSON in ``folder`` as one frame partitioned by set code.
+
+    Sets are read (through their .arrow caches) only when first asked for and
+    are kept together in one frame with a row range per set, so any set or
+    contiguous run of sets is a zero-copy slice of it.
+    """
+
+    def __init__(self, folder="sets", process=None):
+        self.folder = folder
+        self.process = process
+        self.frame = None
+        self.ranges = {}
+        self._sets = {}
+        self._lock = threading.RLock()
+
+    def files(self) -> dict:
+        """Set code -> JSON path of every set in the folder; nothing is read."""
+
+        folder = resource_path(str(self.folder))
+        try:
+            names = sorted(name for name in os.listdir(folder) if name.endswith(".json"))
+        except OSError:
+            return {}
+        return {set_code(name): os.path.join(folder, name) for name in names}
+
+    def code_of(self, json_path):
+        """Set code of ``json_path`` when it is one of this catalog's files, else None."""
+
+        code = set_code(json_path)
+        path = self.files().get(code)
+        if path and os.path.abspath(path) == os.path.abspath(resource_path(str(json_path))):
+            return code
+        return None
+
+    ## MATERIALIZING
+
+    def _stamp(self, path):
+        stat = os.stat(path)
+        return stat.st_mtime_ns, stat.st_size
+
+    def _materialize(self, codes):
+        files = self.files()
+        missing = [code for code in codes if code not in files]
+        if missing:
+            raise KeyError(f"No set file for {', '.join(missing)} in {self.folder}")
+
+        changed = False
+        for code in codes:
+            stamp = self._stamp(files[code])
+            if code not in self._sets or self._sets[code][0] != stamp:
+                df = load_set(files[code])
+                self._sets[code] = (stamp, self.process(df) if self.process else df)
+                changed = True
+
+        if not changed and (self.frame is not None or not self._sets):
+            return
+
+        order = sorted(self._sets)
+        self.frame = concat_sets([self._sets[code][1] for code in order])
+        self.ranges, start = {}, 0
+        for code in order:
+            self.ranges[code] = (start, self._sets[code][1].height)
+            start += self._sets[code][1].height
+
+    def sets(self, codes=None) -> pl.DataFrame:
+        """Cards of ``codes`` (default: every set) in that order; contiguous runs are slices."""
+
+        with self._lock:
+            codes = list(self.files()) if codes is None else [code.lower() for code in codes]
+            self._materialize(codes)
+
+            runs = []
+            for code in codes:
+                start, length = self.ranges[code]
+                if runs and runs[-1][0] + runs[-1][1] == start:
+                    runs[-1][1] += length
+                else:
+                    runs.append([start, length])
+
+            if not runs:
+                return pl.DataFrame(schema=CATALOG_SCHEMA).pipe(apply_schema)
+            parts = [self.frame.slice(start, length) for start, length in runs]
+            return parts[0] if len(parts) == 1 else pl.concat(parts, how="vertical")
+
+    def partition(self, code) -> pl.DataFrame:
+        return self.sets([code])
+
+    ## QUERIES
+
+    def query(self, codes=None, owned=None, mask=None, **where) -> pl.DataFrame:
+        """Cards across ``codes`` matching ``where`` (column=value or column=[values]).
+
+        With ``mask`` (an owned mask over exactly the rows of ``sets(codes)``)
+        and ``owned`` True/False only owned or missing cards are kept, e.g.
+        ``query(mask=sets()["id"].is_in(ids).to_numpy(), owned=False, rarity="Rare EX")``.
+        """
+
+        df = ensure_row_index(self.sets(codes))
+        if mask is not None and owned is not None:
+            if len(mask) != df.height:
+                raise ValueError(f"Owned mask has {len(mask)} rows, the queried sets have {df.height}")
+            df = df.filter(pl.Series(mask, dtype=pl.Boolean) == bool(owned))
+
+        lazy = df.lazy()
+        for column, value in where.items():
+            values = value if isinstance(value, (list, tuple, set)) else [value]
+            lazy = lazy.filter(pl.col(column).cast(pl.String).is_in([str(v) for v in values]))
+        return lazy.collect()
@@ -1,62 +1,163 @@
+from src.utils import LRUCache
 import numpy as np
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 
 class ChartManager:
 
-    def __init__(self, chart_frame):
+    def __init__(self, chart_frame, max_bitmaps: int = 8):
         self.chart_frame = chart_frame
         self.chart_canvas = None
+        self.figure = None
+        self.ax = None
+        self._labels = None
+        self._owned_bars = []
+        self._missing_bars = []
+        self._owned_texts = []
+        self._missing_texts = []
+        self._legend = None
+        self._background = None
+        self._bitmaps = LRUCache(max_bitmaps)
+        self._shown = None
+        self._shown_key = None
 
-    def bar_chart(self, labels, owned_pct, missing_pct):
+    def bar_chart(self, labels, owned_pct, missing_pct, cache_key=None):
+
+        labels = list(labels)
+        self._shown = (labels, owned_pct, missing_pct)
+        self._shown_key = cache_key
+
+        bitmap = self._bitmaps.get(cache_key) if cache_key is not None else None
+        if bitmap is not None and self.chart_canvas is not None:
+            self._ensure_canvas()
+            if labels == self._labels:
+                self._set_values(owned_pct, missing_pct)
+            else:
+                # The screen now shows another grouping than the figure holds, ticks
+                # included; the next update must rebuild rather than blit the axes.
+                self._labels = None
+                self._background = None
+            self.chart_canvas.restore_region(bitmap)
+            self.chart_canvas.blit()
+            return
+
+        if self.chart_canvas is None or labels != self._labels:
+            self._build_chart(labels, owned_pct, missing_pct)
+        else:
+            self._update_bars(owned_pct, missing_pct)
+            self._store_bitmap()
+
+    def _ensure_canvas(self):
+
+        if self.chart_canvas is None:
+            # matplotlib is only imported once a chart is first shown.
+            from matplotlib.figure import Figure
+            from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+
+            self.figure = Figure(figsize=(5, 5))
+            self.ax = self.figure.add_subplot()
+            self.chart_canvas = FigureCanvasTkAgg(self.figure, master=self.chart_frame)
+            self.chart_canvas.mpl_connect("draw_event", self._on_draw)
+            self.chart_canvas.mpl_connect("resize_event", self._on_resize)
+
+        widget = self.chart_canvas.get_tk_widget()
+        if not widget.winfo_manager():
+            widget.pack(fill='both', expand=True)
+
+    def _build_chart(self, labels, owned_pct, missing_pct):
+
+        self._ensure_canvas()
+        ax = self.ax
+        ax.clear()
 
         colors = ["#4caf50", "#e57373"]
         width = 0.5
         x = np.arange(len(labels))
 
-        fig, ax = plt.subplots(figsize=(5, 5))
-        owned_bars = ax.bar(x, owned_pct, width, label='Owned', 
-                   color=colors[0], alpha=0.8)
-        missing_bars = ax.bar(x, missing_pct, width, bottom=owned_pct, 
-                            label='Missing', color=colors[1], alpha=0.8)
-
-        for i, (owned_bar, missing_bar) in enumerate(zip(owned_bars, missing_bars)):
-            if owned_pct[i] > 5:
-                ax.text(owned_bar.get_x() + owned_bar.get_width()/2, owned_pct[i]/2,
-                    f'{owned_pct[i]:.1f}%', ha='center', va='center', 
-                    fontweight='bold', rotation=90)
-            
-            if missing_pct[i] > 5:
-                ax.text(missing_bar.get_x() + missing_bar.get_width()/2,
-                    owned_pct[i] + missing_pct[i]/2, f'{missing_pct[i]:.1f}%',
-                    ha='center', va='center', 
-                    fontweight='bold', rotation = 90, color="#7c0101")
+        self._owned_bars = list(ax.bar(x, owned_pct, width, label='Owned',
+                   color=colors[0], alpha=0.8, animated=True))
+        self._missing_bars = list(ax.bar(x, missing_pct, width, bottom=owned_pct,
+                            label='Missing', color=colors[1], alpha=0.8, animated=True))
+
+        self._owned_texts = [
+            ax.text(bar.get_x() + bar.get_width()/2, 0, '',
+                    ha='center', va='center', fontweight='bold', rotation=90,
+                    animated=True)
+            for bar in self._owned_bars
+        ]
+        self._missing_texts = [
+            ax.text(bar.get_x() + bar.get_width()/2, 0, '',
+                    ha='center', va='center', fontweight='bold', rotation=90,
+                    color="#7c0101", animated=True)
+            for bar in self._missing_bars
+        ]
+        self._set_values(owned_pct, missing_pct)
 
         ax.set_ylabel('Percentage (%)')
         ax.set_xticks(x)
         ax.set_xticklabels(labels, rotation=45, ha='right')
-        ax.legend()
+        self._legend = ax.legend()
+        self._legend.set_animated(True)
         ax.set_ylim(0, 100)
 
-        plt.tight_layout()
-        self._update_chart(fig)
+        self.figure.tight_layout()
+        self._labels = labels
+        self._background = None
+        self.chart_canvas.draw_idle()
 
-    def _update_chart(self, fig):
-        chart_frame = self.chart_frame
+    def _set_values(self, owned_pct, missing_pct):
 
-        if self.chart_canvas:
-            self.chart_canvas.get_tk_widget().destroy()
-        
-        fig.set_size_inches(5, 5)
-        
-        self.chart_canvas = FigureCanvasTkAgg(fig, master=chart_frame)
-        self.chart_canvas.draw_idle()
-        self.chart_canvas.get_tk_widget().pack(fill='both', expand=True)
-        plt.close(fig)
+        for i, (owned, missing) in enumerate(zip(owned_pct, missing_pct)):
+            self._owned_bars[i].set_height(owned)
+            self._missing_bars[i].set_y(owned)
+            self._missing_bars[i].set_height(missing)
+
+            owned_text, missing_text = self._owned_texts[i], self._missing_texts[i]
+            owned_text.set_y(owned/2)
+            owned_text.set_text(f'{owned:.1f}%')
+            owned_text.set_visible(owned > 5)
+            missing_text.set_y(owned + missing/2)
+            missing_text.set_text(f'{missing:.1f}%')
+            missing_text.set_visible(missing > 5)
+
+    def _update_bars(self, owned_pct, missing_pct):
+
+        self._set_values(owned_pct, missing_pct)
+
+        if self._background is None:
+            self.chart_canvas.draw_idle()
+            return
+
+        self.chart_canvas.restore_region(self._background)
+        self._draw_animated()
+        self.chart_canvas.blit(self.ax.bbox)
+
+    def _animated_artists(self):
+        return (self._owned_bars + self._missing_bars + self._owned_texts
+                + self._missing_texts + [self._legend])
+
+    def _draw_animated(self):
+        for artist in self._animated_artists():
+            self.ax.draw_artist(artist)
+
+    def _on_draw(self, event):
+        self._background = self.chart_canvas.copy_from_bbox(self.figure.bbox)
+        self._draw_animated()
+        self._store_bitmap()
+
+    def _store_bitmap(self):
+        if self._shown_key is not None and self._shown[0] == self._labels:
+            self._bitmaps.put(self._shown_key, self.chart_canvas.copy_from_bbox(self.figure.bbox))
+
+    def _on_resize(self, event):
+        # Cached bitmaps have the old size; redraw what is on screen from its data.
+        self._bitmaps.clear()
+        if self._shown is not None and self._shown[0] != self._labels:
+            self._build_chart(*self._shown)
 
     def clear_chart(self):
 
         if self.chart_canvas:
-            self.chart_canvas.get_tk_widget().destroy()
-            self.chart_canvas = None
-
+            self.chart_canvas.get_tk_widget().pack_forget()
+        self._labels = None
+        self._background = None
+        self._shown = None
+        self._shown_key = None
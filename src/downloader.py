@@ -0,0 +1,244 @@
+from src import img_aqcuisition
+from src.manifest import ImageManifest, card_key, NOT_FOUND
+from concurrent.futures import ThreadPoolExecutor, CancelledError, as_completed
+from urllib.parse import urlparse
+import requests
+from requests.adapters import HTTPAdapter
+import threading
+import time
+import os
+
+_RETRY_STATUS = {429, 500, 502, 503, 504}
+MAX_RETRY_AFTER = 60.0
+
+
+class TokenBucket:
+    """Allows ``rate`` requests per second on average with bursts of ``capacity``."""
+
+    def __init__(self, rate: float, capacity: int, cancelled=None):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+        self.cancelled = cancelled or threading.Event()
+
+    def acquire(self) -> bool:
+        """Waits for a token; False when cancelled while waiting."""
+
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return True
+                wait = (1 - self.tokens) / self.rate
+            if self.cancelled.wait(wait):
+                return False
+
+
+class ImageDownloader:
+    """Fetches card images concurrently over one pooled session, politely."""
+
+    def __init__(self, max_workers: int = 6, rate: float = 4.0, burst: int = 4,
+                 retries: int = 4, backoff: float = 0.5, timeout: float = 10,
+                 revalidate: bool = True, on_downloaded=None, archives=None):
+        self.max_workers = max_workers
+        self.rate = rate
+        self.burst = burst
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.revalidate = revalidate
+        self.on_downloaded = on_downloaded
+        self.archives = archives
+
+        self.session = requests.Session()
+        self.session.headers.update(img_aqcuisition.HEADERS)
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=max_workers)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+        self._buckets = {}
+        self._buckets_lock = threading.Lock()
+        self.cancelled = threading.Event()
+        self._futures = []
+        self._manifests = {}
+        self._manifests_lock = threading.Lock()
+
+    def _bucket(self, url) -> TokenBucket:
+        host = urlparse(url).netloc
+        with self._buckets_lock:
+            if host not in self._buckets:
+                self._buckets[host] = TokenBucket(self.rate, self.burst, self.cancelled)
+            return self._buckets[host]
+
+    def _retry_delay(self, attempt, response=None) -> float:
+        retry_after = response.headers.get("Retry-After") if response is not None else None
+        if retry_after and retry_after.isdigit():
+            return min(float(retry_after), MAX_RETRY_AFTER)
+        return self.backoff * 2 ** attempt
+
+    def fetch(self, url, **kwargs):
+        """GET with rate limiting and exponential backoff on 429/5xx and connection errors."""
+
+        kwargs.setdefault("timeout", self.timeout)
+        response = None
+
+        for attempt in range(self.retries + 1):
+            if not self._bucket(url).acquire():
+                return None
+            try:
+                response = self.session.get(url, **kwargs)
+            except requests.exceptions.RequestException:
+                response = None
+            else:
+                if response.status_code not in _RETRY_STATUS:
+                    return response
+                response.close()
+
+            if attempt < self.retries and self.cancelled.wait(self._retry_delay(attempt, response)):
+                return None
+
+        return response
+
+    def manifest(self, folder) -> ImageManifest:
+        with self._manifests_lock:
+            if folder not in self._manifests:
+                self._manifests[folder] = ImageManifest(folder)
+            return self._manifests[folder]
+
+    def save_manifests(self):
+        with self._manifests_lock:
+            manifests = list(self._manifests.values())
+        for manifest in manifests:
+            manifest.save()
+
+    def download_card(self, card_name, card_id, set_name, card_rarity, local_path) -> str:
+        if self.cancelled.is_set():
+            return "cancelled"
+
+        manifest = self.manifest(os.path.dirname(local_path))
+        key = card_key(card_id, card_rarity)
+        entry = manifest.get(key) or {}
+
+        if entry.get("status") == NOT_FOUND:
+            return "skipped"
+        if self.archives and self.archives.locate(local_path):
+            return "packed"
+
+        exists = os.path.exists(local_path)
+        if exists and not entry:
+            # Downloaded before the manifest existed: adopt the file as is.
+            manifest.record_file(key, local_path, url=None)
+            return "cached"
+
+        current = exists and manifest.is_current(key, local_path)
+        if current and not (self.revalidate and entry.get("url")):
+            return "cached"
+
+        url = entry.get("url")
+        if not url:
+            responses = []
+
+            def fetch_page(page_url):
+                response = self.fetch(page_url)
+                responses.append(response)
+                return response
+
+            url = img_aqcuisition.get_image(
+                card_name=card_name,
+                card_id=card_id,
+                set_name=set_name,
+                card_rarity=card_rarity,
+                fetch=fetch_page,
+            )
+            if not url:
+                # Only a definite answer from the wiki marks the card as missing.
+                if all(r is not None and r.status_code not in _RETRY_STATUS for r in responses):
+                    manifest.record(key, status=NOT_FOUND, url=None)
+                return "not found"
+
+        headers = {}
+        if current:
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+
+        response = self.fetch(url, stream=True, headers=headers)
+        if response is None:
+            return "failed"
+        if response.status_code == 304:
+            response.close()
+            manifest.record(key)
+            return "unchanged"
+        if response.status_code != 200:
+            response.close()
+            return "failed"
+
+        tmp_path = local_path + ".part"
+        try:
+            with open(tmp_path, "wb") as f:
+                for chunk in response.iter_content(chunk_size=8192):
+                    if self.cancelled.is_set():
+                        raise OSError("Download cancelled")
+                    f.write(chunk)
+            os.replace(tmp_path, local_path)
+        except (OSError, requests.exceptions.RequestException):
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return "failed"
+        finally:
+            response.close()
+
+        manifest.record_file(key, local_path, url=url,
+                             etag=response.headers.get("ETag"),
+                             last_modified=response.headers.get("Last-Modified"))
+        if self.on_downloaded:
+            try:
+                self.on_downloaded(local_path)
+            except Exception as e:
+                print(f"Post-processing failed for {local_path}: {e}")
+        return "downloaded"
+
+    def run(self, jobs, progress=None):
+        """Download ``jobs`` (download_card argument tuples); ``progress(done, total, job, status)``
+        is called from worker threads, so it must only hand data over to the UI thread."""
+
+        total = len(jobs)
+        results = {}
+
+        try:
+            with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="download") as pool:
+                futures = {pool.submit(self.download_card, *job): job for job in jobs}
+                self._futures = list(futures)
+                if self.cancelled.is_set():
+                    self.cancel()
+                for done, future in enumerate(as_completed(futures), start=1):
+                    job = futures[future]
+                    try:
+                        status = future.result()
+                    except CancelledError:
+                        status = "cancelled"
+                    except Exception as e:
+                        status = f"failed: {e}"
+                    results[job] = status
+                    if progress:
+                        progress(done, total, job, status)
+        finally:
+            self.save_manifests()
+
+        return results
+
+    def cancel(self):
+        """Stops waiting workers and drops queued jobs, so no thread outlives the app."""
+
+        self.cancelled.set()
+        for future in self._futures:
+            future.cancel()
+
+    def close(self):
+        self.session.close()
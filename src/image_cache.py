@@ -0,0 +1,199 @@
+from src.utils import LRUCache
+from concurrent.futures import ThreadPoolExecutor
+import io
+import itertools
+import os
+import threading
+
+
+class ThumbnailCache:
+    """Card images pre-scaled for the viewer, kept on disk and as ready PhotoImages.
+
+    Color and grayscale variants are written next to the source image the first
+    time a card is downloaded or shown. Images found in a set archive are read
+    from it, including any packed thumbnails, and nothing is written for them.
+    Decoded thumbnails may be loaded from any thread; PhotoImages are only
+    created on the Tk thread. PIL is imported on first use.
+    """
+
+    def __init__(self, size=(480, 420), max_images: int = 64, max_photos: int = 32,
+                 archives=None):
+        self.size = size
+        self.folder_name = f"thumbs_{size[0]}x{size[1]}"
+        self.archives = archives
+        self._images = LRUCache(max_images)
+        self._photos = LRUCache(max_photos)
+        self._lock = threading.Lock()
+
+    def thumb_path(self, source_path, owned: bool):
+        folder, filename = os.path.split(source_path)
+        stem = os.path.splitext(filename)[0]
+        suffix = "" if owned else "_gray"
+        return os.path.join(folder, self.folder_name, f"{stem}{suffix}.png")
+
+    def _scaled_size(self, image):
+        scale = min(self.size[0] / image.width, self.size[1] / image.height)
+        return int(image.width * scale), int(image.height * scale)
+
+    def _scale(self, original):
+        from PIL import Image
+
+        new_size = self._scaled_size(original)
+        return {
+            True: original.resize(new_size, Image.Resampling.LANCZOS),
+            False: original.convert("L").resize(new_size, Image.Resampling.LANCZOS),
+        }
+
+    def generate(self, source_path):
+        """Writes both variants of the file ``source_path`` to disk and returns them by owned state."""
+        from PIL import Image
+
+        with Image.open(source_path) as original:
+            variants = self._scale(original)
+
+        for owned, image in variants.items():
+            path = self.thumb_path(source_path, owned)
+            tmp_path = path + ".tmp"
+            try:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                image.save(tmp_path, format="PNG")
+                os.replace(tmp_path, path)
+            except OSError as e:
+                print(f"Could not save thumbnail {path}: {e}")
+
+        return variants
+
+    def _source(self, source_path):
+        """(mtime, archive entry or None) of a card image, preferring the set archive."""
+
+        packed = self.archives.locate(source_path) if self.archives else None
+        if packed:
+            return packed[0].mtime, packed
+        try:
+            return os.path.getmtime(source_path), None
+        except OSError:
+            return None
+
+    def _decode(self, data):
+        from PIL import Image
+
+        image = Image.open(io.BytesIO(data))
+        image.load()
+        return image
+
+    def _read_packed(self, source_path, owned, packed):
+        variant = self.folder_name if owned else f"{self.folder_name}|gray"
+        thumb = self.archives.locate(source_path, variant)
+        if thumb:
+            return self._decode(thumb[0].read(thumb[1]))
+
+        archive, entry = packed
+        with self._decode(archive.read(entry)) as original:
+            return self._scale(original)[bool(owned)]
+
+    def _read_thumb(self, path, source_mtime):
+        from PIL import Image
+
+        try:
+            if os.path.getmtime(path) < source_mtime:
+                return None
+            image = Image.open(path)
+            image.load()
+            return image
+        except OSError:
+            return None
+
+    def load(self, source_path, owned: bool, source=None):
+        """Scaled PIL image for a card, or None when its image is not available locally.
+
+        ``source`` is ``_source(source_path)`` when the caller already has it.
+        """
+
+        source = source or self._source(source_path)
+        if source is None:
+            return None
+        mtime, packed = source
+        key = (source_path, mtime, bool(owned))
+
+        with self._lock:
+            image = self._images.get(key)
+        if image is not None:
+            return image
+
+        try:
+            if packed:
+                image = self._read_packed(source_path, owned, packed)
+            else:
+                image = self._read_thumb(self.thumb_path(source_path, owned), mtime)
+                if image is None:
+                    image = self.generate(source_path)[bool(owned)]
+        except Exception as e:
+            print(f"Error loading local image {source_path}: {e}")
+            return None
+
+        with self._lock:
+            self._images.put(key, image)
+        return image
+
+    @property
+    def capacity(self) -> int:
+        return self._images.max_entries
+
+    def photo(self, source_path, owned: bool):
+        """PhotoImage for a card, reused while it stays in the LRU; Tk thread only."""
+
+        source = self._source(source_path)
+        if source is None:
+            return None
+
+        key = (source_path, source[0], bool(owned))
+        photo = self._photos.get(key)
+        if photo is None:
+            image = self.load(source_path, owned, source)
+            if image is None:
+                return None
+            from PIL import ImageTk
+
+            photo = ImageTk.PhotoImage(image)
+            self._photos.put(key, photo)
+        return photo
+
+    def clear(self):
+        with self._lock:
+            self._images.clear()
+        self._photos.clear()
+
+
+class ThumbnailPrefetcher:
+    """Decodes thumbnails of nearby cards into a ThumbnailCache on a background thread.
+
+    Each call to ``prefetch`` supersedes the previous one, so a jump in the
+    selection stops work on cards that are no longer close to it.
+    """
+
+    def __init__(self, cache: ThumbnailCache):
+        self.cache = cache
+        self.generation = 0
+        self.pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="prefetch")
+
+    def prefetch(self, items):
+        """Loads ``(source_path, owned)`` items in order, nearest first."""
+
+        self.generation += 1
+        # Leave room for the card on screen so prefetching never evicts it.
+        items = list(itertools.islice(items, max(0, self.cache.capacity - 1)))
+        if items:
+            self.pool.submit(self._run, self.generation, items)
+
+    def _run(self, generation, items):
+        for source_path, owned in items:
+            if generation != self.generation:
+                return
+            self.cache.load(source_path, owned)
+
+    def cancel(self):
+        self.generation += 1
+
+    def shutdown(self):
+        self.cancel()
+        self.pool.shutdown(wait=False, cancel_futures=True)
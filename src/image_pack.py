@@ -0,0 +1,203 @@
+"""Packed per-set image archives.
+
+An archive ``img/<Set_Name>.pack`` holds every image of the loose folder
+``img/<Set_Name>/`` (and its thumbnail folders) in one file:
+
+    header   magic (8 bytes), index offset (u64, little endian)
+    blobs    the PNG files, back to back
+    index    JSON object: entry key -> [offset, length]
+
+Build or refresh the archives with ``python -m src.image_pack [img_folder] [set ...]``.
+"""
+from src.manifest import card_key
+import json
+import mmap
+import os
+import re
+import struct
+import sys
+import threading
+import time
+
+MAGIC = b"TCGPACK1"
+SUFFIX = ".pack"
+_HEADER = struct.Struct("<8sQ")
+_FILENAME = re.compile(r"^(?P<name>.*)_(?P<id>\d+)_(?P<rarity>[^\\/]+)\.png$")
+_GRAY = "_gray"
+
+
+def entry_key(filename, variant=None):
+    """Archive key of an image file name, ``id|rarity`` plus the thumbnail variant if any."""
+
+    stem = filename
+    if variant and stem.endswith(_GRAY + ".png"):
+        stem = stem[:-len(_GRAY + ".png")] + ".png"
+        variant = f"{variant}|gray"
+
+    match = _FILENAME.match(stem)
+    if not match:
+        return None
+
+    key = card_key(match["id"], match["rarity"])
+    return f"{key}|{variant}" if variant else key
+
+
+def archive_path(set_folder):
+    return os.path.normpath(set_folder) + SUFFIX
+
+
+class ImageArchive:
+    """Read-only, memory-mapped view of one set archive."""
+
+    def __init__(self, path):
+        self.path = path
+        self.mtime = os.path.getmtime(path)
+        self._file = open(path, "rb")
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            magic, index_offset = _HEADER.unpack_from(self._map, 0)
+            if magic != MAGIC:
+                raise ValueError(f"{path} is not an image archive")
+            self.index = json.loads(self._map[index_offset:].decode("utf-8"))
+        except Exception:
+            self._file.close()
+            raise
+
+    def __contains__(self, key):
+        return key in self.index
+
+    def __len__(self):
+        return len(self.index)
+
+    def read(self, key) -> bytes:
+        offset, length = self.index[key]
+        return self._map[offset:offset + length]
+
+    def close(self):
+        self._map.close()
+        self._file.close()
+
+
+class ArchiveStore:
+    """Maps loose image paths to entries of their set's archive, when one exists.
+
+    Lookups touch the disk only when a folder is first seen or its last check is
+    older than ``check_interval`` seconds; after ``refresh`` every folder is checked again.
+    An archive is reopened when its file appears, changes or goes away.
+    """
+
+    def __init__(self, check_interval: float = 5.0):
+        self.check_interval = check_interval
+        self._archives = {}
+        self._lock = threading.Lock()
+
+    def _stamp(self, folder):
+        try:
+            stat = os.stat(archive_path(folder))
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def _open(self, folder, stamp):
+        archive = None
+        if stamp is not None:
+            path = archive_path(folder)
+            try:
+                archive = ImageArchive(path)
+            except (OSError, ValueError) as e:
+                print(f"Ignoring image archive {path}: {e}")
+        return archive
+
+    def _archive(self, folder):
+        now = time.monotonic()
+        with self._lock:
+            cached = self._archives.get(folder)
+            if cached is not None and now - cached[1] < self.check_interval:
+                return cached[2]
+
+            stamp = self._stamp(folder)
+            if cached is None or cached[0] != stamp:
+                # A replaced archive is not closed here: another thread may still be
+                # reading from it, and its map is released once nothing refers to it.
+                cached = (stamp, now, self._open(folder, stamp))
+            self._archives[folder] = (cached[0], now, cached[2])
+            return cached[2]
+
+    def locate(self, source_path, variant=None):
+        """``(archive, key)`` holding ``source_path`` (or its thumbnail ``variant``), else None."""
+
+        folder, filename = os.path.split(source_path)
+        archive = self._archive(folder)
+        if archive is None:
+            return None
+
+        key = entry_key(filename, variant)
+        return (archive, key) if key in archive else None
+
+    def refresh(self):
+        """Makes the next lookup in every folder check for a new, rebuilt or removed archive."""
+
+        with self._lock:
+            self._archives = {
+                folder: (stamp, float("-inf"), archive)
+                for folder, (stamp, _, archive) in self._archives.items()
+            }
+
+
+def _entries(set_folder):
+    """(key, path) of every image in a loose set folder and its thumbnail folders."""
+
+    for item in sorted(os.listdir(set_folder)):
+        path = os.path.join(set_folder, item)
+        if os.path.isdir(path) and item.startswith("thumbs_"):
+            for filename in sorted(os.listdir(path)):
+                key = entry_key(filename, variant=item)
+                if key:
+                    yield key, os.path.join(path, filename)
+        elif os.path.isfile(path):
+            key = entry_key(item)
+            if key:
+                yield key, path
+
+
+def build_archive(set_folder, out_path=None):
+    """Packs a loose set folder into one archive; returns (archive path, entry count)."""
+
+    out_path = out_path or archive_path(set_folder)
+    tmp_path = out_path + ".tmp"
+    index = {}
+
+    with open(tmp_path, "wb") as out:
+        out.write(_HEADER.pack(MAGIC, 0))
+        for key, path in _entries(set_folder):
+            if key in index:
+                continue
+            with open(path, "rb") as f:
+                data = f.read()
+            index[key] = [out.tell(), len(data)]
+            out.write(data)
+
+        index_offset = out.tell()
+        out.write(json.dumps(index, separators=(",", ":")).encode("utf-8"))
+        out.seek(0)
+        out.write(_HEADER.pack(MAGIC, index_offset))
+
+    os.replace(tmp_path, out_path)
+    return out_path, len(index)
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    image_folder = argv[0] if argv else "img"
+    set_names = argv[1:] or sorted(
+        item for item in os.listdir(image_folder)
+        if os.path.isdir(os.path.join(image_folder, item))
+    )
+
+    for set_name in set_names:
+        path, count = build_archive(os.path.join(image_folder, set_name))
+        print(f"{path}: {count} images")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,23 @@
 import requests
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
 from urllib.parse import quote
+import html
 import re
 
+HEADERS = {"User-Agent": "Mozilla/5.0"}
+TIMEOUT = 10
+_WINDOW = 4096
+
+RARITY_TITLES = {
+    "Full Art": "Illustration Rare",
+    "Full Art EX Support": "Super Rare",
+    "Special Full Art": "Special Illustration Rare",
+    "Immersive": "Immersive",
+    "Gold Crown": "Ultra Rare",
+    "One shiny star": "Shiny Rare",
+    "Two shiny star": "Shiny Super Rare",
+}
+
 
 def build_search_url(card_name, card_id, set_name, card_rarity):
     set_name = set_name.split("(")[0].replace(" ", "_")
@@ -27,53 +42,89 @@ def build_search_url(card_name, card_id, set_name, card_rarity):
     return base_url, encoded_set
 
 
-def extract_image_url(soup, card_name_parsed, card_rarity, encoded_name):
-    rarity_anchors = {
-        "Full Art": "Illustration Rare",
-        "Full Art EX Support": "Super Rare",
-        "Special Full Art": "Special Illustration Rare",
-        "Immersive": "Immersive",
-        "Gold Crown": "Ultra Rare",
-        "One shiny star": "Shiny Rare",
-        "Two shiny star": "Shiny Super Rare",
-    }
+def _image_src(infobox):
+    img = infobox.find("img")
+    if img and img.get("src"):
+        img_url = img["src"]
+        if img_url.startswith("//"):
+            img_url = "https:" + img_url
+        img_url = img_url.replace("thumb/", "").split(".png")[0] + ".png"
+        return img_url
+    return None
+
 
+def extract_image_url(soup, card_name_parsed, card_rarity, encoded_name):
     ## Special symbol case
     card_name_parsed = quote(re.sub(r"[♂♀.]", "", card_name_parsed))
 
-    if card_rarity in rarity_anchors:
-        infobox = soup.find(title=rarity_anchors[card_rarity])
-    else:
-        infobox = soup.find(title=card_rarity)
+    infobox = soup.find(title=RARITY_TITLES.get(card_rarity, card_rarity))
 
     if not infobox:
         infobox = soup.find("a", href=lambda href: href and encoded_name in href)
 
     if infobox:
-        img = infobox.find("img")
-        if img and img.get("src"):
-            img_url = img["src"]
-            if img_url.startswith("//"):
-                img_url = "https:" + img_url
-            img_url = img_url.replace("thumb/", "").split(".png")[0] + ".png"
-            return img_url
+        return _image_src(infobox)
 
     return None
 
 
-def get_image(card_name, card_id, set_name="Celestial_Guardians", card_rarity=None):
+def _find_in_window(page, title):
+    """Parses only a small slice of the page starting at the first tag carrying ``title``."""
+
+    match = re.search(r'\stitle="%s"' % re.escape(html.escape(title)), page)
+    if not match:
+        return None
+
+    start = page.rfind("<", 0, match.start())
+    window = BeautifulSoup(page[start:start + _WINDOW], "html.parser")
+    infobox = window.find(title=title)
+    return _image_src(infobox) if infobox else None
+
+
+def extract_image_url_from_html(page, card_name_parsed, card_rarity, encoded_name):
+    """Same result as extract_image_url on the full page, without building the whole tree.
+
+    Tries a windowed parse around the anchor title first, then SoupStrainer parses
+    that only keep the candidate elements. Without a title the full parse is used.
+    """
+
+    title = RARITY_TITLES.get(card_rarity, card_rarity)
+
+    if title:
+        img_url = _find_in_window(page, title)
+        if img_url:
+            return img_url
+
+        titled = BeautifulSoup(page, "html.parser", parse_only=SoupStrainer(title=title))
+        infobox = titled.find(title=title)
+        if infobox:
+            return _image_src(infobox)
+
+        linked = BeautifulSoup(page, "html.parser", parse_only=SoupStrainer(
+            "a", href=lambda href: href and encoded_name in href))
+        infobox = linked.find("a")
+        return _image_src(infobox) if infobox else None
+
+    soup = BeautifulSoup(page, "html.parser")
+    return extract_image_url(soup, card_name_parsed, card_rarity, encoded_name)
+
+
+def _default_fetch(url):
+    return requests.get(url, headers=HEADERS, timeout=TIMEOUT)
+
+
+def get_image(card_name, card_id, set_name="Celestial_Guardians", card_rarity=None, fetch=None):
+    """``fetch(url)`` performs the page requests, e.g. ImageDownloader.fetch for a pooled session."""
+    fetch = fetch or _default_fetch
     card_name_parsed = card_name.replace(" ", "")
     search_url, encoded_set = build_search_url(card_name, card_id, set_name, card_rarity)
-    headers = {"User-Agent": "Mozilla/5.0"}
-    response = requests.get(search_url, headers=headers)
+    response = fetch(search_url)
 
-    if response.status_code != 200:
+    if response is None or response.status_code != 200:
         fallback_url = f"https://bulbapedia.bulbagarden.net/wiki/{card_name.replace(' ', '_')}_(TCG_Pocket)"
-        response = requests.get(fallback_url, headers=headers)
-        if response.status_code != 200:
+        response = fetch(fallback_url)
+        if response is None or response.status_code != 200:
             return None
 
-    soup = BeautifulSoup(response.text, "html.parser")
     encoded_name = encoded_set[3:-3].replace("_", "")
-    img_url = extract_image_url(soup, card_name_parsed, card_rarity, encoded_name)
-    return img_url
+    return extract_image_url_from_html(response.text, card_name_parsed, card_rarity, encoded_name)
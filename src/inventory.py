@@ -0,0 +1,106 @@
+import numpy as np
+import polars as pl
+import itertools
+
+_VERSIONS = itertools.count(1)
+
+
+class Inventory:
+    """Owned cards as a boolean mask aligned to the catalog's row index."""
+
+    def __init__(self, size: int = 0, indices=()):
+        self.mask = np.zeros(size, dtype=bool)
+        self.version = next(_VERSIONS)
+        self.update(indices)
+
+    @classmethod
+    def from_mask(cls, mask) -> "Inventory":
+        inventory = cls()
+        inventory.mask = np.asarray(mask, dtype=bool).copy()
+        inventory.touch()
+        return inventory
+
+    def touch(self):
+        """Mark the mask as changed; versions are unique across all inventories."""
+        self.version = next(_VERSIONS)
+
+    @property
+    def size(self) -> int:
+        return self.mask.size
+
+    def resize(self, size: int):
+        mask = np.zeros(size, dtype=bool)
+        keep = min(size, self.size)
+        mask[:keep] = self.mask[:keep]
+        self.mask = mask
+        self.touch()
+
+    def _valid(self, idx) -> bool:
+        return isinstance(idx, (int, np.integer)) and 0 <= idx < self.size
+
+    def __contains__(self, idx) -> bool:
+        return self._valid(idx) and bool(self.mask[idx])
+
+    def __len__(self) -> int:
+        return int(np.count_nonzero(self.mask))
+
+    def __iter__(self):
+        return iter(np.flatnonzero(self.mask).tolist())
+
+    def add(self, idx):
+        if self._valid(idx):
+            self.mask[idx] = True
+            self.touch()
+
+    def discard(self, idx):
+        if self._valid(idx):
+            self.mask[idx] = False
+            self.touch()
+
+    def remove(self, idx):
+        if idx not in self:
+            raise KeyError(idx)
+        self.mask[idx] = False
+        self.touch()
+
+    def update(self, indices):
+        rows = np.fromiter(
+            (idx for idx in indices if self._valid(idx)), dtype=np.int64
+        )
+        self.mask[rows] = True
+        self.touch()
+
+    def clear(self):
+        self.mask[:] = False
+        self.touch()
+
+    def copy(self) -> "Inventory":
+        return Inventory.from_mask(self.mask)
+
+    def union(self, other: "Inventory") -> "Inventory":
+        return Inventory.from_mask(self.mask | other.mask)
+
+    def difference(self, other: "Inventory") -> "Inventory":
+        return Inventory.from_mask(self.mask & ~other.mask)
+
+    def intersection(self, other: "Inventory") -> "Inventory":
+        return Inventory.from_mask(self.mask & other.mask)
+
+    __or__ = union
+    __sub__ = difference
+    __and__ = intersection
+
+    def count(self, rows=None) -> int:
+        if rows is None:
+            return len(self)
+        if isinstance(rows, pl.Series):
+            rows = rows.to_numpy()
+        return int(np.count_nonzero(self.mask[rows]))
+
+    def to_series(self, name: str = "owned") -> pl.Series:
+        return pl.Series(name, self.mask)
+
+    def owned(self, df: pl.DataFrame) -> pl.Series:
+        if "row_idx" not in df.columns:
+            return self.to_series()
+        return pl.Series("owned", self.mask[df["row_idx"].to_numpy()])
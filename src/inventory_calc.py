@@ -1,144 +1,130 @@
-from src.utils import ensure_row_index, get_set_df
-import polars as pl
+from src import logic
+from src.logic import _TYPE_CARDS
+from src.stats_engine import StatsEngine
+from src.utils import SET_RARITIES
+import numpy as np
 
 class InventoryManager:
 
-    def __init__(self, df, inventory):
+    def __init__(self, df, inventory, encodings=None):
+        self.reset(df, inventory, encodings)
+
+    def reset(self, df, inventory, encodings=None):
         self.df = df
         self.inventory = inventory
+        self.stats = StatsEngine(df, inventory, encodings)
+        self.card_index = (
+            dict(zip(df["id"].cast(str).to_list(), range(df.height)))
+            if "id" in df.columns else {}
+        )
+
+    def row_of_card(self, card_id):
+
+        return self.card_index.get(str(card_id))
+
+    def toggle(self, idx):
+
+        return self.stats.toggle(idx)
+
+    def _update_completion(self, is_set):
 
-    def _update_completion(self, df):
+        return self.stats.counts(is_set)
 
-        owned_set = ensure_row_index(df).filter(pl.col("row_idx").is_in(list(self.inventory)))
-        set_missing = df.height - owned_set.height
-        return df.height, owned_set.height, set_missing
-    
-    def update_completion(self, df: pl.DataFrame, is_set: bool, display_order):
+    def update_completion(self, is_set: bool, display_order):
 
         color = "#1c9625" if is_set else "#2b2ee9"
-        df = ensure_row_index(df)
-
-        total_counts = df.group_by('pack').len().rename({'len': 'total'})
-        owned_df = df.filter(pl.col("row_idx").is_in(list(self.inventory)))
-        owned_counts = owned_df.group_by('pack').len().rename({'len': 'owned'})
-
-        joined = (
-            total_counts
-            .join(owned_counts, on="pack", how="left")
-            .with_columns([
-                pl.col("owned").fill_null(0),
-                (pl.col("total") - pl.col("owned")).alias("missing")
-            ])
-            .sort("pack")
-        )
+
+        joined = [
+            {"pack": pack, "owned": owned, "total": total, "missing": total - owned}
+            for pack, owned, total in self.stats.group_counts("pack", is_set)
+        ]
 
         pack_order = {pack:i for i, pack in enumerate(display_order)}
         joined_rows = sorted(
-            joined.iter_rows(named=True),
+            joined,
             key=lambda row: pack_order.get(row['pack'], 9999)
         )
 
         return joined_rows, color
-    
-    def _update_count(self):
 
-        total, owned = len(self.df), len(self.inventory)
-        missing = total - owned
+    def profile_completion(self, store, profile=None, is_set: bool = False, by="set_code"):
+        """Owned/total per ``by`` for stored profiles, counted by the profile store itself."""
 
-        return total, owned, missing
+        rarities = SET_RARITIES if is_set else None
+        return store.completion(by=by, name=profile, rarities=rarities)
+
+    def _update_count(self):
+
+        return self.stats.counts(is_set=False)
 
     def _update_suggestion(self, is_set):
 
-        df = get_set_df(self.df) if is_set else self.df
-        df = ensure_row_index(df)
-        relevant_indices = set(df["row_idx"].to_list())
-        missing_cards = df.filter(
-            (~pl.col("row_idx").is_in(self.inventory)) &
-            (pl.col("row_idx").is_in(list(relevant_indices))) &
-            pl.col("rarity").is_not_null() &
-            pl.col("pack").is_not_null()
-        )
+        labels, owned, total = self.stats.matrix(("pack", "rarity"), is_set)
+        if owned is None:
+            return [], [], None
+
+        packs, rarities = labels
+        return packs, rarities, total - owned
 
-        return missing_cards
-    
     def _get_incomplete_packs(self, is_set):
-        
-        df = get_set_df(self.df) if is_set else self.df
-        df = ensure_row_index(df)
 
-        if "pack" not in df.columns:
+        if "pack" not in self.stats.df.columns:
             return []
-        
-        pack_counts = df["pack"].value_counts()
-        owned_packs = (
-            df
-            .filter(pl.col("row_idx").is_in(self.inventory))["pack"]
-            .value_counts()
-        )
-
-        incomplete_df = (
-            pack_counts.join(owned_packs, on='pack', how='left', suffix='_owned')
-            .with_columns([
-                pl.col('count_owned').fill_null(0).alias('owned'),
-                pl.col('count').alias('total')
-            ])
-            .with_columns([
-                (pl.col('total') - pl.col('owned')).alias('missing')
-            ])
-            .filter(
-                (pl.col('pack') != 'Both') &
-                (pl.col('missing') > 0)
-            )
-            .select(['pack', 'owned', 'total', 'missing'])
-        )
 
-        incomplete = incomplete_df.rows()
+        incomplete = [
+            (pack, owned, total, total - owned)
+            for pack, owned, total in self.stats.group_counts("pack", is_set)
+            if pack != 'Both' and total - owned > 0
+        ]
 
         return incomplete
 
     def _calculate_pack_probabilities(self, packs, missing_cards, prob_matrix):
 
-        pack_probs = {}
+        pack_labels, rarities, missing = missing_cards
+        if missing is None:
+            return {}
 
-        for pack in packs:
+        p_123, p_4, p_5 = prob_matrix[:, 0], prob_matrix[:, 1], prob_matrix[:, 2]
+        card_prob = np.append(1 - (1 - p_123)**3 * (1 - p_4) * (1 - p_5), 0.0)
+        rarity_rows = [
+            _TYPE_CARDS.index(rarity) if rarity in _TYPE_CARDS else len(_TYPE_CARDS)
+            for rarity in rarities
+        ]
 
-            pack_name = pack[0]
-            filtered = missing_cards.filter(
-                (pl.col("pack") == pack_name) | (pl.col("pack") == "Both")
-            ).select("rarity")
-        
-            if filtered.height == 0:
-                pack_probs[pack_name] = 0.0
-            else:
-                prob_seted = filtered.with_columns(
-                    (pl.col('rarity').replace_strict(prob_matrix)).alias('rar_prob')
-                ).with_columns(
-                    pl.col('rar_prob').list.to_struct(fields=['P_123', 'P_4', 'P_5'])
-                ).unnest('rar_prob').with_columns([(
-                    (1 - ((1-pl.col('P_123'))**3 * (1-pl.col('P_4')) * (1-pl.col('P_5'))))
-                    .cast(pl.Decimal(precision=20, scale=15))
-                    .alias('P')
-                )]).select(
-                    pl.sum('P')
-                ).item()
-                pack_probs[pack_name] = float(prob_seted)
-        
-        return pack_probs
-
-    def _display_pack_suggestion(self, pack_probs) -> str:
+        if "Both" in pack_labels:
+            missing = missing + missing[pack_labels.index("Both")]
+
+        probs = missing.astype(np.float64) @ card_prob[rarity_rows]
+        pack_index = {pack: i for i, pack in enumerate(pack_labels)}
+
+        return {pack[0]: float(probs[pack_index[pack[0]]]) for pack in packs}
+
+    def pack_suggestion(self, packs, missing_cards, current_set, complete) -> str:
+
+        prob_matrix = logic.calc_prob(current_set=current_set)
+        pack_probs = self._calculate_pack_probabilities(packs, missing_cards, prob_matrix)
+
+        if not pack_probs:
+            return "No probability data available."
+
+        return self._display_pack_suggestion(pack_probs, complete).strip()
+
+    def _display_pack_suggestion(self, pack_probs, complete=None) -> str:
 
         max_prob = max(pack_probs.values())
         best_packs = [p for p, v in pack_probs.items()
                       if abs(v - max_prob) < 1e-8]
         suggestion = ""
 
-        df = ensure_row_index(self.df)
-        missing_df = df.filter(~pl.col("row_idx").is_in(list(self.inventory)))
-        if missing_df.is_empty():
+        if complete is None:
+            complete = self.stats.counts(is_set=False)[2] == 0
+
+        if complete:
             suggestion += "You have all cards in your collection.\n"
 
         if len(best_packs) == 1:
-            max_prob = 1 if max_prob > 1 else max_prob 
+            max_prob = 1 if max_prob > 1 else max_prob
             if max_prob == 1:
                 suggestion += f"Suggestion: Open '{best_packs[0]}' pack.\nIt's more likely to get a new card with it!"
             else:
@@ -0,0 +1,151 @@
+"""Append-only journal of inventory changes.
+
+Every toggle is queued as ``timestamp<TAB>card id<TAB>0|1`` and written by a
+background thread, so a click never waits on disk. Compaction writes the
+whole inventory as a .pif v2 snapshot (atomic rename) and then starts a new,
+empty journal. Recovery is the snapshot plus a replay of the journal; events
+are absolute owned states, so replaying one that the snapshot already holds
+is harmless.
+"""
+from src import progress_file
+from src.inventory import Inventory
+from src.session import SESSION_DIR
+import os
+import queue
+import threading
+import time
+
+
+class InventoryJournal:
+    """Crash-safe autosave of inventory changes, written and compacted off the Tk thread."""
+
+    def __init__(self, folder=SESSION_DIR, fsync_interval: float = 1.0):
+        self.folder = folder
+        self.journal_path = os.path.join(folder, "journal.log")
+        self.snapshot_path = os.path.join(folder, "inventory.pif")
+        self.fsync_interval = fsync_interval
+        self.changes = 0
+        self.queue = queue.Queue()
+        self._thread = None
+
+    def start(self):
+        os.makedirs(self.folder, exist_ok=True)
+        self._thread = threading.Thread(target=self._run, name="journal", daemon=True)
+        self._thread.start()
+
+    ## RECORDING
+
+    def record(self, card_id, owned: bool):
+        self.queue.put(("event", f"{time.time():.3f}\t{card_id}\t{int(bool(owned))}\n"))
+        self.changes += 1
+
+    def compact(self, df, inventory, json_path):
+        """Snapshot the current inventory and start an empty journal, both off-thread."""
+
+        self.queue.put(("compact", df, inventory.mask.copy(), str(json_path)))
+        self.changes = 0
+
+    def close(self, timeout: float = 2.0):
+        if self._thread is not None:
+            self.queue.put(None)
+            self._thread.join(timeout)
+            self._thread = None
+
+    ## RECOVERY
+
+    def _snapshot(self):
+        try:
+            return progress_file.read_progress(self.snapshot_path)
+        except (OSError, ValueError):
+            return None
+
+    def saved_catalog(self):
+        """json_path of the catalog the last snapshot was taken with, or None without one."""
+
+        progress = self._snapshot()
+        return progress.json_path if progress is not None else None
+
+    def recover(self, df):
+        """Owned mask over ``df`` from the last snapshot plus the journal, or None without a snapshot.
+
+        Both are keyed by card id; the caller opens the snapshot's catalog first.
+        """
+
+        progress = self._snapshot()
+        if progress is None:
+            return None
+
+        mask, _ = progress.mask_for(df)
+        rows = dict(zip(df["id"].cast(str).to_list(), range(df.height)))
+
+        try:
+            with open(self.journal_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    parts = line.rstrip("\n").split("\t")
+                    # A torn last line from a crash is simply skipped.
+                    if len(parts) == 3 and parts[1] in rows and parts[2] in ("0", "1"):
+                        mask[rows[parts[1]]] = parts[2] == "1"
+        except OSError:
+            pass
+
+        return mask
+
+    def set_aside(self):
+        """Keep a snapshot and journal that cannot be recovered as *.unrecovered instead of overwriting them."""
+
+        for path in (self.snapshot_path, self.journal_path):
+            if os.path.exists(path):
+                os.replace(path, path + ".unrecovered")
+
+    ## WRITER THREAD
+
+    def _run(self):
+        journal = open(self.journal_path, "a", encoding="utf-8")
+        last_sync = time.monotonic()
+
+        while True:
+            batch = [self.queue.get()]
+            while True:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            for item in batch:
+                if item is None:
+                    journal.flush()
+                    os.fsync(journal.fileno())
+                    journal.close()
+                    return
+                if item[0] == "event":
+                    journal.write(item[1])
+                else:
+                    journal = self._compact(journal, *item[1:])
+
+            journal.flush()
+            if time.monotonic() - last_sync >= self.fsync_interval:
+                os.fsync(journal.fileno())
+                last_sync = time.monotonic()
+
+    def _compact(self, journal, df, mask, json_path):
+        try:
+            progress_file.write_progress(
+                self.snapshot_path, df, Inventory.from_mask(mask), json_path, fsync=True
+            )
+            self._sync_folder()
+        except Exception as e:
+            print(f"Could not compact inventory journal: {e}")
+            return journal
+
+        journal.close()
+        return open(self.journal_path, "w", encoding="utf-8")
+
+    def _sync_folder(self):
+        # Makes the snapshot's rename durable before the journal is truncated (POSIX only).
+        if os.name != "posix":
+            return
+        fd = os.open(self.folder, os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
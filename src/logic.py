@@ -1,6 +1,7 @@
+from src.utils import resource_path
 import numpy as np
 import json
-import polars as pl
+import os
 
 _PROB_PACK = [0.9995, 0.0005]
 _TYPE_CARDS = [
@@ -16,15 +17,57 @@ _TYPE_CARDS = [
     "Two shiny star",
     "Gold Crown"
 ]
+_PROB_FILE = "utils/prob_set.json"
 
-with open("utils/prob_set.json", "r") as f:
-    _DICT_DATA = pl.from_dicts(json.load(f))
+
+class ProbabilityTables:
+    """Pack probability matrices, read on first use and cached per set."""
+
+    def __init__(self, path=_PROB_FILE):
+        self.path = path
+        self._mtime = None
+        self._raw = {}
+        self._matrices = {}
+
+    def _load(self):
+        path = resource_path(self.path)
+        mtime = os.path.getmtime(path)
+        if mtime == self._mtime:
+            return
+
+        with open(path, "r") as f:
+            data = json.load(f)
+
+        self._raw = {
+            entry["set"]: np.asarray(entry["prob"], dtype=np.float64) / 100
+            for entry in data
+        }
+        self._matrices.clear()
+        self._mtime = mtime
+
+    def reload(self):
+        self._mtime = None
+        self._load()
+
+    def get(self, current_set) -> np.ndarray:
+        self._load()
+
+        prob_matrix = self._matrices.get(current_set)
+        if prob_matrix is None:
+            prob_imp = self._raw[current_set]
+            prob_matrix = _PROB_PACK[0] * prob_imp[:, :-1] + _PROB_PACK[1] * prob_imp[:, -1:]
+            prob_matrix.setflags(write=False)
+            self._matrices[current_set] = prob_matrix
+
+        return prob_matrix
+
+
+_TABLES = ProbabilityTables()
 
 
 def calc_prob(current_set):
-    prob_imp = (
-        np.array(_DICT_DATA.row(by_predicate=(pl.col("set") == current_set))[1]) / 100
-    )
-    prob_matrix = _PROB_PACK[0] * prob_imp[:, :-1] + _PROB_PACK[1] * prob_imp[:, -1:]
+    return _TABLES.get(current_set)
+
 
-    return dict(zip(_TYPE_CARDS, prob_matrix.tolist()))
+def reload_prob():
+    _TABLES.reload()
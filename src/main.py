@@ -1,11 +1,20 @@
-from src.gui import CollectionViewer
+from src.startup import timer
+from src.GUI import CollectionViewer
 from src import importer
+from src.session import load_session
 import asyncio
+import sys
 
 async def main():
-	df = importer.read_json_file()
-	app = CollectionViewer(df)
+	timer.mark("imports")
+	session = load_session()
+	df = session.df if session else importer.read_json_file()
+	timer.mark("session" if session else "catalog")
+	app = CollectionViewer(
+		df, startup_timer=timer, report_startup="--startup-timing" in sys.argv,
+		session=session,
+	)
 	app.mainloop()
 
 if __name__ == '__main__':
-	asyncio.run(main())
\ No newline at end of file
+	asyncio.run(main())
@@ -0,0 +1,88 @@
+import hashlib
+import json
+import os
+import threading
+import time
+
+MANIFEST_NAME = "manifest.json"
+FOUND = "found"
+NOT_FOUND = "not_found"
+
+
+def card_key(card_id, card_rarity) -> str:
+    return f"{card_id}|{card_rarity}"
+
+
+def file_sha256(path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ImageManifest:
+    """Resolved image URLs, HTTP validators and file hashes for one set's image folder."""
+
+    def __init__(self, folder):
+        self.folder = folder
+        self.path = os.path.join(folder, MANIFEST_NAME)
+        self.entries = {}
+        self.dirty = False
+        self.lock = threading.Lock()
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return
+        if isinstance(data, dict) and isinstance(data.get("cards"), dict):
+            self.entries = data["cards"]
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            return dict(entry) if entry else None
+
+    def record(self, key, **fields):
+        with self.lock:
+            entry = self.entries.setdefault(key, {})
+            entry.update(fields)
+            entry["checked"] = int(time.time())
+            self.dirty = True
+
+    def record_file(self, key, local_path, **fields):
+        """Store the hash, size and mtime of a downloaded file alongside ``fields``."""
+
+        stat = os.stat(local_path)
+        self.record(key, status=FOUND, file=os.path.basename(local_path),
+                    sha256=file_sha256(local_path), size=stat.st_size,
+                    mtime=stat.st_mtime, **fields)
+
+    def is_current(self, key, local_path) -> bool:
+        """True when ``local_path`` is the file the manifest recorded, judged by size and mtime."""
+
+        entry = self.get(key)
+        if not entry or entry.get("status") != FOUND:
+            return False
+        try:
+            stat = os.stat(local_path)
+        except OSError:
+            return False
+        return entry.get("size") == stat.st_size and entry.get("mtime") == stat.st_mtime
+
+    def save(self):
+        with self.lock:
+            if not self.dirty:
+                return
+            data = {"version": 1, "cards": self.entries}
+            tmp_path = self.path + ".tmp"
+            try:
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    json.dump(data, f, indent=1, sort_keys=True)
+                os.replace(tmp_path, self.path)
+                self.dirty = False
+            except OSError as e:
+                print(f"Could not save image manifest {self.path}: {e}")
@@ -0,0 +1,204 @@
+"""Profiles and their owned cards in one SQLite database.
+
+Ownership is keyed by card id, so a profile can be applied to any catalog that
+contains its cards. Queries come back as Polars frames.
+"""
+from src.progress_file import card_numbers
+import sqlite3
+import time
+import numpy as np
+import polars as pl
+
+PROFILE_DB = "profiles.db"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS profiles (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE,
+    updated REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS sets (
+    code TEXT PRIMARY KEY,
+    name TEXT
+);
+CREATE TABLE IF NOT EXISTS cards (
+    id TEXT PRIMARY KEY,
+    set_code TEXT NOT NULL REFERENCES sets(code),
+    name TEXT,
+    rarity TEXT,
+    pack TEXT
+);
+CREATE INDEX IF NOT EXISTS cards_set ON cards(set_code);
+CREATE INDEX IF NOT EXISTS cards_rarity ON cards(rarity);
+CREATE TABLE IF NOT EXISTS ownership (
+    profile_id INTEGER NOT NULL REFERENCES profiles(id) ON DELETE CASCADE,
+    card_id TEXT NOT NULL REFERENCES cards(id),
+    PRIMARY KEY (profile_id, card_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS ownership_card ON ownership(card_id);
+"""
+
+
+def _frame(cursor) -> pl.DataFrame:
+    columns = [column[0] for column in cursor.description]
+    rows = cursor.fetchall()
+    if not rows:
+        return pl.DataFrame({column: [] for column in columns})
+    return pl.DataFrame(rows, schema=columns, orient="row")
+
+
+class ProfileStore:
+    """Embedded multi-profile store: WAL journaling, indexed lookups, bulk writes."""
+
+    def __init__(self, path=PROFILE_DB):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("PRAGMA foreign_keys=ON")
+        self.conn.executescript(_SCHEMA)
+        self._registered = None
+
+    def close(self):
+        self.conn.close()
+
+    ## CATALOG
+
+    def upsert_catalog(self, df: pl.DataFrame):
+        """Registers the catalog's sets and cards; existing rows are updated in place."""
+
+        if df is self._registered:
+            return
+
+        prefixes, _ = card_numbers(df)
+        cards = df.select(
+            pl.col("id").cast(pl.String),
+            pl.Series("set_code", prefixes),
+            *[
+                (pl.col(col).cast(pl.String) if col in df.columns else pl.lit(None, pl.String)).alias(col)
+                for col in ("name", "rarity", "pack", "set")
+            ],
+        ).filter(pl.col("set_code") != "")
+
+        sets = cards.group_by("set_code").agg(pl.col("set").first())
+        with self.conn:
+            self.conn.executemany(
+                "INSERT INTO sets (code, name) VALUES (?, ?) "
+                "ON CONFLICT(code) DO UPDATE SET name = excluded.name",
+                sets.rows(),
+            )
+            self.conn.executemany(
+                "INSERT INTO cards (id, set_code, name, rarity, pack) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT(id) DO UPDATE SET set_code = excluded.set_code, name = excluded.name, "
+                "rarity = excluded.rarity, pack = excluded.pack",
+                cards.select("id", "set_code", "name", "rarity", "pack").rows(),
+            )
+        self._registered = df
+
+    ## PROFILES
+
+    def profiles(self) -> pl.DataFrame:
+        return _frame(self.conn.execute(
+            "SELECT p.id, p.name, COUNT(o.card_id) AS owned, p.updated "
+            "FROM profiles p LEFT JOIN ownership o ON o.profile_id = p.id "
+            "GROUP BY p.id ORDER BY p.name"
+        ))
+
+    def profile_id(self, name, create: bool = False):
+        row = self.conn.execute("SELECT id FROM profiles WHERE name = ?", (name,)).fetchone()
+        if row:
+            return row[0]
+        if not create:
+            return None
+        with self.conn:
+            cursor = self.conn.execute(
+                "INSERT INTO profiles (name, updated) VALUES (?, ?)", (name, time.time())
+            )
+        return cursor.lastrowid
+
+    def delete_profile(self, name):
+        with self.conn:
+            self.conn.execute("DELETE FROM profiles WHERE name = ?", (name,))
+
+    ## OWNERSHIP
+
+    def save_inventory(self, name, df: pl.DataFrame, inventory):
+        """Stores the owned cards of ``df`` for profile ``name``; cards of other catalogs are kept."""
+
+        self.upsert_catalog(df)
+        profile = self.profile_id(name, create=True)
+        ids = df["id"].cast(pl.String)
+        owned = ids.filter(pl.Series(inventory.mask[:df.height]))
+
+        with self.conn:
+            self.conn.execute("CREATE TEMP TABLE IF NOT EXISTS catalog_ids (id TEXT PRIMARY KEY)")
+            self.conn.execute("DELETE FROM catalog_ids")
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO catalog_ids (id) VALUES (?)", ((i,) for i in ids.to_list())
+            )
+            self.conn.execute(
+                "DELETE FROM ownership WHERE profile_id = ? AND card_id IN (SELECT id FROM catalog_ids)",
+                (profile,),
+            )
+            self.conn.executemany(
+                "INSERT INTO ownership (profile_id, card_id) VALUES (?, ?)",
+                ((profile, card_id) for card_id in owned.to_list()),
+            )
+            self.conn.execute(
+                "UPDATE profiles SET updated = ? WHERE id = ?", (time.time(), profile)
+            )
+
+    def set_owned(self, name, card_id, owned: bool):
+        profile = self.profile_id(name, create=True)
+        with self.conn:
+            if owned:
+                self.conn.execute(
+                    "INSERT OR IGNORE INTO ownership (profile_id, card_id) VALUES (?, ?)",
+                    (profile, str(card_id)),
+                )
+            else:
+                self.conn.execute(
+                    "DELETE FROM ownership WHERE profile_id = ? AND card_id = ?",
+                    (profile, str(card_id)),
+                )
+
+    def owned_ids(self, name) -> pl.DataFrame:
+        return _frame(self.conn.execute(
+            "SELECT o.card_id AS id FROM ownership o JOIN profiles p ON p.id = o.profile_id "
+            "WHERE p.name = ?",
+            (name,),
+        ))
+
+    def owned_mask(self, name, df: pl.DataFrame) -> np.ndarray:
+        owned = self.owned_ids(name)["id"].cast(pl.String)
+        return df["id"].cast(pl.String).is_in(owned).fill_null(False).to_numpy()
+
+    ## QUERIES
+
+    def completion(self, by: str = "set_code", name=None, rarities=None) -> pl.DataFrame:
+        """Owned/total cards per ``by`` (set_code, pack or rarity) for every profile, or just ``name``.
+
+        Only the counts leave the database; no profile is loaded into memory.
+        """
+
+        if by not in ("set_code", "pack", "rarity"):
+            raise ValueError(f"Cannot group completion by {by!r}")
+
+        where, params = [], []
+        if name is not None:
+            where.append("p.name = ?")
+            params.append(name)
+        card_filter = ""
+        if rarities:
+            card_filter = f"WHERE c.rarity IN ({', '.join('?' * len(rarities))})"
+            params = list(rarities) + params
+
+        query = (
+            f"SELECT p.name AS profile, c.{by} AS {by}, COUNT(*) AS total, "
+            f"COUNT(o.card_id) AS owned "
+            f"FROM (SELECT * FROM cards c {card_filter}) c CROSS JOIN profiles p "
+            f"LEFT JOIN ownership o ON o.profile_id = p.id AND o.card_id = c.id "
+            f"{'WHERE ' + ' AND '.join(where) if where else ''} "
+            f"GROUP BY p.id, c.{by} ORDER BY p.name, c.{by}"
+        )
+        return _frame(self.conn.execute(query, params))
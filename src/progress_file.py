@@ -0,0 +1,149 @@
+"""Inventory (.pif) files.
+
+v1 is text: a ``#json_path=`` header and one catalog row index per line, so it
+only means something against the exact catalog it was saved with.
+
+v2 is binary and keyed by card id (``a3-001`` is bit 1 of set ``a3``):
+
+    magic      b"PIF2"
+    length     u32, little endian
+    header     JSON: json_path, catalog fingerprint, [{"set", "bits", "offset"}]
+    bitsets    np.packbits of each set's owned card numbers, back to back
+"""
+import hashlib
+import json
+import os
+import shutil
+import struct
+import numpy as np
+import polars as pl
+
+MAGIC = b"PIF2"
+VERSION = 2
+_LENGTH = struct.Struct("<I")
+
+
+def card_numbers(df: pl.DataFrame):
+    """Set prefix and card number of every catalog row, e.g. ("a3", 1) for "a3-001"."""
+
+    parts = df.select(
+        pl.col("id").cast(pl.String).str.extract(r"^(.*)-\d+$").alias("set"),
+        pl.col("id").cast(pl.String).str.extract(r"-(\d+)$").cast(pl.Int64, strict=False).alias("number"),
+    )
+    return (
+        parts["set"].fill_null("").to_numpy(),
+        parts["number"].fill_null(-1).to_numpy(),
+    )
+
+
+def catalog_fingerprint(df: pl.DataFrame) -> str:
+    ids = df["id"].cast(pl.String).fill_null("").sort()
+    return hashlib.sha1("\n".join(ids.to_list()).encode("utf-8")).hexdigest()
+
+
+class ProgressFile:
+    """Contents of a .pif file, mapped onto a catalog with ``mask_for``."""
+
+    def __init__(self, version, json_path, sets=None, indices=None, fingerprint=None):
+        self.version = version
+        self.json_path = json_path
+        self.sets = sets or {}
+        self.indices = indices
+        self.fingerprint = fingerprint
+
+    def mask_for(self, df: pl.DataFrame):
+        """Owned mask over ``df`` rows and the number of saved cards it has no row for."""
+
+        if self.version == 1:
+            indices = self.indices[(self.indices >= 0) & (self.indices < df.height)]
+            mask = np.zeros(df.height, dtype=bool)
+            mask[indices] = True
+            return mask, int(self.indices.size - indices.size)
+
+        prefixes, numbers = card_numbers(df)
+        mask = np.zeros(df.height, dtype=bool)
+        unmatched = 0
+
+        for prefix, bits in self.sets.items():
+            rows = np.flatnonzero(prefixes == prefix)
+            in_range = rows[(numbers[rows] >= 0) & (numbers[rows] < bits.size)]
+            mask[in_range] = bits[numbers[in_range]]
+
+            saved = np.zeros(bits.size, dtype=bool)
+            saved[numbers[in_range]] = True
+            unmatched += int(np.count_nonzero(bits & ~saved))
+
+        return mask, unmatched
+
+
+def write_progress(path, df: pl.DataFrame, inventory, json_path, fsync: bool = False):
+    prefixes, numbers = card_numbers(df)
+    owned = inventory.mask[:df.height] & (numbers >= 0)
+
+    sets, blobs, offset = [], [], 0
+    for prefix in sorted(set(prefixes[owned].tolist())):
+        rows = np.flatnonzero(owned & (prefixes == prefix))
+        bits = np.zeros(int(numbers[rows].max()) + 1, dtype=bool)
+        bits[numbers[rows]] = True
+        blob = np.packbits(bits).tobytes()
+        sets.append({"set": prefix, "bits": int(bits.size), "offset": offset})
+        blobs.append(blob)
+        offset += len(blob)
+
+    header = json.dumps({
+        "version": VERSION,
+        "json_path": str(json_path),
+        "fingerprint": catalog_fingerprint(df),
+        "sets": sets,
+    }).encode("utf-8")
+
+    tmp_path = str(path) + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(MAGIC + _LENGTH.pack(len(header)) + header)
+        f.write(b"".join(blobs))
+        if fsync:
+            f.flush()
+            os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def _read_v1(data: bytes) -> ProgressFile:
+    lines = data.decode("utf-8", errors="replace").splitlines()
+    json_path = ""
+    if lines and lines[0].startswith("#json_path="):
+        json_path = lines.pop(0).split("=", 1)[1].strip()
+
+    indices = [int(line) for line in map(str.strip, lines) if line.lstrip("-").isdigit()]
+    return ProgressFile(1, json_path, indices=np.unique(np.array(indices, dtype=np.int64)))
+
+
+def read_progress(path) -> ProgressFile:
+    with open(path, "rb") as f:
+        data = f.read()
+
+    if not data.startswith(MAGIC):
+        return _read_v1(data)
+
+    start = len(MAGIC) + _LENGTH.size
+    (length,) = _LENGTH.unpack_from(data, len(MAGIC))
+    header = json.loads(data[start:start + length].decode("utf-8"))
+    if header.get("version") != VERSION:
+        raise ValueError(f"Unsupported inventory file version: {header.get('version')}")
+
+    body = np.frombuffer(data, dtype=np.uint8, offset=start + length)
+    sets = {}
+    for entry in header["sets"]:
+        nbytes = (entry["bits"] + 7) // 8
+        packed = body[entry["offset"]:entry["offset"] + nbytes]
+        sets[entry["set"]] = np.unpackbits(packed, count=entry["bits"]).astype(bool)
+
+    return ProgressFile(VERSION, header["json_path"], sets=sets, fingerprint=header["fingerprint"])
+
+
+def migrate_v1(path, progress: ProgressFile, df: pl.DataFrame, inventory):
+    """Rewrite a v1 file as v2 using the catalog it was read against; the original is kept as .v1."""
+
+    backup = str(path) + ".v1"
+    if not os.path.exists(backup):
+        shutil.copy2(path, backup)
+    write_progress(path, df, inventory, progress.json_path)
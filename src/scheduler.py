@@ -0,0 +1,53 @@
+class RefreshScheduler:
+    """Marks panels dirty and refreshes them together once the Tk loop is idle."""
+
+    def __init__(self, widget, delay: int = 0):
+        self.widget = widget
+        self.delay = delay
+        self.panels = {}
+        self.dirty = set()
+        self.held = False
+        self._pending = None
+
+    def register(self, name, callback, is_visible=None):
+        self.panels[name] = (callback, is_visible)
+
+    def mark(self, *names):
+        self.dirty.update(names or self.panels)
+        self._schedule()
+
+    def hold(self):
+        """Collect marks without refreshing until ``release``, e.g. while starting up."""
+        self.held = True
+
+    def release(self):
+        """Stop holding and refresh everything marked in the meantime right away."""
+        self.held = False
+        self.cancel()
+        self.flush()
+
+    def _schedule(self):
+        if self._pending is not None or not self.dirty or self.held:
+            return
+        if self.delay:
+            self._pending = self.widget.after(self.delay, self.flush)
+        else:
+            self._pending = self.widget.after_idle(self.flush)
+
+    def flush(self):
+        self._pending = None
+        if self.held:
+            return
+
+        for name, (callback, is_visible) in self.panels.items():
+            if name not in self.dirty:
+                continue
+            if is_visible is not None and not is_visible():
+                continue
+            self.dirty.discard(name)
+            callback()
+
+    def cancel(self):
+        if self._pending is not None:
+            self.widget.after_cancel(self._pending)
+            self._pending = None
@@ -0,0 +1,119 @@
+"""Snapshot of the last session, restored at startup when its sources are unchanged.
+
+The folder holds ``catalog.arrow`` (the processed catalog, rewritten only when
+the catalog changes) and ``state.npz`` (view state as JSON, the inventory mask
+and the stats engine's group codes), each replaced atomically.
+"""
+import json
+import os
+import numpy as np
+import polars as pl
+
+SESSION_DIR = ".session"
+VERSION = 1
+_CATALOG = "catalog.arrow"
+_STATE = "state.npz"
+
+
+def _stamp(path):
+    stat = os.stat(path)
+    return [stat.st_mtime_ns, stat.st_size]
+
+
+def source_paths(json_path):
+    return [path for path in str(json_path or "").split(";") if path]
+
+
+class Session:
+    """State restored from a snapshot: catalog, inventory mask, view and stats encodings."""
+
+    def __init__(self, df, mask, json_path, group, is_set, encodings):
+        self.df = df
+        self.mask = mask
+        self.json_path = json_path
+        self.group = group
+        self.is_set = is_set
+        self.encodings = encodings
+
+
+def _replace(path, write):
+    tmp_path = path + ".tmp"
+    try:
+        write(tmp_path)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def save_session(df, inventory, json_path, group, is_set, stats=None,
+                 write_catalog=True, folder=SESSION_DIR):
+    os.makedirs(folder, exist_ok=True)
+    catalog_file = os.path.join(folder, _CATALOG)
+
+    if write_catalog or not os.path.exists(catalog_file):
+        _replace(catalog_file, lambda path: df.write_ipc(path, compression="uncompressed"))
+
+    sources = [[path, *_stamp(path)] for path in source_paths(json_path) if os.path.exists(path)]
+    arrays = {"mask": inventory.mask}
+    tracked = []
+    if stats is not None:
+        for i, columns in enumerate(stats.codes):
+            arrays[f"codes_{i}"] = stats.codes[columns]
+            tracked.append({"columns": list(columns), "labels": stats.labels[columns]})
+
+    state = {
+        "version": VERSION,
+        "json_path": str(json_path),
+        "sources": sources,
+        "catalog": _stamp(catalog_file),
+        "rows": df.height,
+        "group": group,
+        "is_set": bool(is_set),
+        "stats": tracked,
+    }
+    arrays["state"] = np.array(json.dumps(state))
+
+    def write_state(path):
+        with open(path, "wb") as f:
+            np.savez(f, **arrays)
+
+    _replace(os.path.join(folder, _STATE), write_state)
+
+
+def load_session(folder=SESSION_DIR):
+    """The saved Session, or None when there is none or any of its sources changed."""
+
+    catalog_file = os.path.join(folder, _CATALOG)
+    try:
+        with np.load(os.path.join(folder, _STATE)) as data:
+            state = json.loads(str(data["state"]))
+            if state.get("version") != VERSION:
+                return None
+
+            for path, mtime_ns, size in state["sources"]:
+                if _stamp(path) != [mtime_ns, size]:
+                    return None
+            if _stamp(catalog_file) != state["catalog"]:
+                return None
+
+            rows = state["rows"]
+            mask = data["mask"].astype(bool)
+            encodings = {}
+            for i, tracked in enumerate(state["stats"]):
+                codes = data[f"codes_{i}"]
+                if codes.size != rows:
+                    return None
+                size = int(np.prod([len(labels) for labels in tracked["labels"]]))
+                encodings[tuple(tracked["columns"])] = (tracked["labels"], codes, size)
+
+        # Read into memory rather than mapped: the file is replaced while the app runs.
+        with open(catalog_file, "rb") as f:
+            df = pl.read_ipc(f.read())
+    except Exception:
+        return None
+
+    if df.height != rows or mask.size != rows:
+        return None
+
+    return Session(df, mask, state["json_path"], state["group"], state["is_set"], encodings)
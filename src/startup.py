@@ -0,0 +1,28 @@
+import time
+
+
+class StartupTimer:
+    """Wall-clock checkpoints from the first import to a usable window."""
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.marks = []
+
+    def mark(self, label):
+        self.marks.append((label, time.perf_counter()))
+
+    def total(self) -> float:
+        end = self.marks[-1][1] if self.marks else time.perf_counter()
+        return end - self.start
+
+    def report(self) -> str:
+        lines = []
+        previous = self.start
+        for label, moment in self.marks:
+            lines.append(f"{label:<20}{(moment - previous) * 1000:8.1f} ms")
+            previous = moment
+        lines.append(f"{'total':<20}{self.total() * 1000:8.1f} ms")
+        return "\n".join(lines)
+
+
+timer = StartupTimer()
@@ -0,0 +1,159 @@
+from src.inventory import Inventory
+from src.utils import ensure_row_index, SET_RARITIES
+import numpy as np
+import polars as pl
+
+
+def _encode(series: pl.Series):
+    if isinstance(series.dtype, pl.Enum):
+        labels = series.dtype.categories.to_list()
+        codes = series.to_physical().fill_null(len(labels)).to_numpy().astype(np.int64)
+        return labels + ["None"], codes
+
+    if series.dtype == pl.Categorical:
+        physical = series.to_physical().fill_null(-1).to_numpy()
+        _, first, codes = np.unique(physical, return_index=True, return_inverse=True)
+        labels = series.gather(first).cast(pl.String).fill_null("None").to_numpy()
+    else:
+        values = series.cast(pl.String).fill_null("None").to_numpy()
+        labels, codes = np.unique(values, return_inverse=True)
+
+    order = np.argsort(labels, kind="stable")
+    remap = np.empty_like(order)
+    remap[order] = np.arange(order.size)
+    return labels[order].tolist(), remap[codes].astype(np.int64)
+
+
+class StatsEngine:
+    """Owned/total counters per column value, updated in O(1) on every toggle."""
+
+    def __init__(self, df: pl.DataFrame, inventory: Inventory, encodings=None):
+        self.df = ensure_row_index(df)
+        self.size = self.df.height
+        if inventory.size != self.size:
+            inventory.resize(self.size)
+        self.inventory = inventory
+        self.owned = inventory.mask
+
+        if "rarity" in self.df.columns:
+            self.in_set = self.df["rarity"].is_in(SET_RARITIES).fill_null(False).to_numpy()
+        else:
+            self.in_set = np.zeros(self.size, dtype=bool)
+
+        self.set_total = int(self.in_set.sum())
+        self.owned_total = int(self.owned.sum())
+        self.set_owned_total = int((self.owned & self.in_set).sum())
+
+        self.labels = {}
+        self.codes = {}
+        self.totals = {}
+        self.owned_counts = {}
+
+        # Encodings saved by a previous session skip the per-column encode.
+        for columns, (labels, codes, size) in (encodings or {}).items():
+            if codes.size == self.size and all(col in self.df.columns for col in columns):
+                self.adopt(columns, labels, codes.astype(np.int64), size)
+
+        for columns in (("pack",), ("rarity",), ("pack", "rarity")):
+            self.track(*columns)
+
+    def is_tracked(self, *columns) -> bool:
+        return columns in self.codes
+
+    def encode(self, *columns):
+        """Group codes for ``columns``; reads only immutable state, so it is safe off the UI thread."""
+
+        labels, codes, size = [], np.zeros(self.size, dtype=np.int64), 1
+        for col in columns:
+            col_labels, col_codes = _encode(self.df[col])
+            labels.append(col_labels)
+            codes = codes * len(col_labels) + col_codes
+            size *= len(col_labels)
+
+        return labels, codes, size
+
+    def track(self, *columns):
+        if columns in self.codes:
+            return True
+        if any(col not in self.df.columns for col in columns):
+            return False
+
+        self.adopt(columns, *self.encode(*columns))
+        return True
+
+    def adopt(self, columns, labels, codes, size):
+        columns = tuple(columns)
+        if columns in self.codes:
+            return
+
+        self.labels[columns] = labels
+        self.codes[columns] = codes
+        for is_set, scope in ((False, None), (True, self.in_set)):
+            in_scope = np.ones(self.size, dtype=bool) if scope is None else scope
+            self.totals[columns, is_set] = np.bincount(codes[in_scope], minlength=size)
+            self.owned_counts[columns, is_set] = np.bincount(
+                codes[in_scope & self.owned], minlength=size
+            )
+
+    def is_owned(self, idx) -> bool:
+        return bool(self.owned[idx])
+
+    def set_owned(self, idx, owned: bool) -> bool:
+        if not 0 <= idx < self.size or self.owned[idx] == owned:
+            return False
+
+        self.owned[idx] = owned
+        self.inventory.touch()
+        delta = 1 if owned else -1
+        in_set = self.in_set[idx]
+        self.owned_total += delta
+        if in_set:
+            self.set_owned_total += delta
+
+        for columns, codes in self.codes.items():
+            code = codes[idx]
+            self.owned_counts[columns, False][code] += delta
+            if in_set:
+                self.owned_counts[columns, True][code] += delta
+        return True
+
+    def toggle(self, idx) -> bool:
+        owned = not self.owned[idx]
+        self.set_owned(idx, owned)
+        return owned
+
+    def counts(self, is_set: bool):
+        if is_set:
+            total, owned = self.set_total, self.set_owned_total
+        else:
+            total, owned = self.size, self.owned_total
+        return total, owned, total - owned
+
+    def group_counts(self, column, is_set: bool):
+        if not self.track(column):
+            return []
+
+        key = (column,)
+        totals, owned = self.totals[key, is_set], self.owned_counts[key, is_set]
+        return [
+            (label, int(owned[i]), int(totals[i]))
+            for i, label in enumerate(self.labels[key][0])
+            if totals[i] > 0
+        ]
+
+    def label_counts(self, column, label, is_set: bool):
+        for name, owned, total in self.group_counts(column, is_set):
+            if name == str(label):
+                return owned, total
+        return 0, 0
+
+    def matrix(self, columns, is_set: bool):
+        columns = tuple(columns)
+        if not self.track(*columns):
+            return [], None, None
+
+        labels = self.labels[columns]
+        shape = tuple(len(col_labels) for col_labels in labels)
+        totals = self.totals[columns, is_set].reshape(shape)
+        owned = self.owned_counts[columns, is_set].reshape(shape)
+        return labels, owned, totals
@@ -1,7 +1,10 @@
+from collections import OrderedDict
 import sys
 import os
 import polars as pl
 
+SET_RARITIES = ['Common', 'Uncommon', 'Rare', 'Rare EX']
+
 
 def resource_path(relative_path):
     """Get absolute path to resource, works for dev, PyInstaller, and external folders."""
@@ -22,6 +25,34 @@ def safe_str(value):
     return str(value) if value is not None else ""
 
 def get_set_df(df:pl.DataFrame) -> pl.DataFrame:
-    set_rarities = ['Common', 'Uncommon', 'Rare', 'Rare EX']
     df = ensure_row_index(df)
-    return df.filter(pl.col('rarity').is_in(set_rarities))
+    return df.filter(pl.col('rarity').is_in(SET_RARITIES))
+
+
+class LRUCache:
+    """Small least-recently-used cache with a fixed number of entries."""
+
+    def __init__(self, max_entries: int = 16):
+        self.max_entries = max_entries
+        self._data = OrderedDict()
+
+    def get(self, key, default=None):
+        if key not in self._data:
+            return default
+        self._data.move_to_end(key)
+        return self._data[key]
+
+    def put(self, key, value):
+        self._data[key] = value
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_entries:
+            self._data.popitem(last=False)
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def __len__(self):
+        return len(self._data)
+
+    def clear(self):
+        self._data.clear()
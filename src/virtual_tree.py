@@ -0,0 +1,287 @@
+import tkinter as tk
+from tkinter import ttk
+import numpy as np
+
+
+class VirtualTree:
+    """Grouped table on a ttk.Treeview that only creates items for the visible rows.
+
+    Rows are kept as catalog row indices and rendered through ``row_values`` into
+    a small pool of item slots that is reused while scrolling.
+    """
+
+    def __init__(self, tree: ttk.Treeview, scrollbar: ttk.Scrollbar, row_values,
+                 on_select=None, buffer: int = 2):
+        self.tree = tree
+        self.scrollbar = scrollbar
+        self.row_values = row_values
+        self.on_select = on_select
+        self.buffer = buffer
+
+        self.groups = []
+        self.total = 0
+        self.top = 0
+        self.selected = None
+        self.slots = []
+        self._group_index = {}
+        self._ends = np.zeros(0, dtype=np.int64)
+        self._slot_lines = {}
+        self._slot_state = {}
+        self._user_pick = False
+
+        rowheight = ttk.Style(tree).lookup("Treeview", "rowheight")
+        self.row_height = int(rowheight) if rowheight else 20
+        self.heading_height = self.row_height
+
+        scrollbar.configure(command=self.yview)
+        tree.bind("<Configure>", lambda e: self.refresh(), add="+")
+        tree.bind("<ButtonPress-1>", self._on_press, add="+")
+        tree.bind("<<TreeviewSelect>>", self._on_tree_select, add="+")
+        tree.bind("<MouseWheel>", self._on_wheel)
+        tree.bind("<Button-4>", lambda e: self._scroll(-3))
+        tree.bind("<Button-5>", lambda e: self._scroll(3))
+        tree.bind("<Up>", lambda e: self._move(-1))
+        tree.bind("<Down>", lambda e: self._move(1))
+        tree.bind("<Prior>", lambda e: self._move(-self._visible_count()))
+        tree.bind("<Next>", lambda e: self._move(self._visible_count()))
+        tree.bind("<Home>", lambda e: self._move(-self.total))
+        tree.bind("<End>", lambda e: self._move(self.total))
+
+    ## MODEL
+
+    def set_groups(self, groups):
+        """Reconcile the content with ``(key, header_values, row_indices, open)`` groups.
+
+        Groups already shown keep their open state, and the line at the top of
+        the viewport stays in place when it is still part of the new content.
+        """
+
+        was_open = {group["key"]: group["open"] for group in self.groups}
+        anchor = self._key(*self._line(self.top)) if self.total else None
+
+        self.groups = [
+            {"key": key, "values": list(values),
+             "rows": np.asarray(rows, dtype=np.int64),
+             "open": was_open.get(key, bool(is_open))}
+            for key, values, rows, is_open in groups
+        ]
+        self._group_index = {group["key"]: i for i, group in enumerate(self.groups)}
+        self._layout()
+
+        line = self._line_of_key(anchor) if anchor else None
+        if line is not None:
+            self.top = line
+        self.refresh()
+
+    def reset(self):
+        """Forget open groups, scroll position and selection, e.g. after loading another catalog."""
+
+        self.groups = []
+        self._group_index = {}
+        self._layout()
+        self.top = 0
+        self.selected = None
+
+    def _layout(self):
+        sizes = [1 + (len(g["rows"]) if g["open"] else 0) for g in self.groups]
+        self._ends = np.cumsum(sizes, dtype=np.int64)
+        self.total = int(self._ends[-1]) if sizes else 0
+
+    def _line(self, n):
+        g = int(np.searchsorted(self._ends, n, side="right"))
+        start = int(self._ends[g - 1]) if g else 0
+        offset = n - start
+        row = None if offset == 0 else int(self.groups[g]["rows"][offset - 1])
+        return g, row
+
+    def _line_of_key(self, key):
+        kind, value = key
+        if kind == "group":
+            g = self._group_index.get(value)
+            return None if g is None else (int(self._ends[g - 1]) if g else 0)
+
+        for g, group in enumerate(self.groups):
+            if not group["open"]:
+                continue
+            hits = np.flatnonzero(group["rows"] == value)
+            if hits.size:
+                start = int(self._ends[g - 1]) if g else 0
+                return start + 1 + int(hits[0])
+        return None
+
+    def _key(self, g, row):
+        return ("group", self.groups[g]["key"]) if row is None else ("row", row)
+
+    def toggle_group(self, key, is_open=None):
+        g = self._group_index.get(key)
+        if g is None:
+            return
+
+        group = self.groups[g]
+        group["open"] = not group["open"] if is_open is None else bool(is_open)
+        self._layout()
+        self.refresh()
+
+    def set_group_values(self, key, values):
+        g = self._group_index.get(key)
+        if g is not None:
+            self.groups[g]["values"] = list(values)
+
+    ## ITEM LOOKUP
+
+    def group_of(self, item):
+        """Key of the group whose header is shown by ``item``, None for card rows."""
+
+        line = self._slot_lines.get(item)
+        if line is None or line[1] is not None:
+            return None
+        return self.groups[line[0]]["key"]
+
+    def parent_of(self, item):
+        line = self._slot_lines.get(item)
+        return None if line is None else self.groups[line[0]]["key"]
+
+    def row_of(self, item):
+        line = self._slot_lines.get(item)
+        return None if line is None else line[1]
+
+    def rows_around_selection(self, count):
+        """Card rows near the selection in display order: the next and previous ``count``
+        lines, nearest first, then the rest of the selected line's open group."""
+
+        line = self._line_of_key(self.selected) if self.selected else None
+        if line is None:
+            return []
+
+        rows = []
+        for step in range(1, count + 1):
+            for n in (line + step, line - step):
+                if 0 <= n < self.total:
+                    row = self._line(n)[1]
+                    if row is not None:
+                        rows.append(row)
+
+        group = self.groups[self._line(line)[0]]
+        if group["open"]:
+            rows.extend(group["rows"].tolist())
+
+        selected_row = self.selected[1] if self.selected[0] == "row" else None
+        return [row for row in dict.fromkeys(rows) if row != selected_row]
+
+    ## RENDERING
+
+    def _visible_count(self):
+        if self.slots:
+            bbox = self.tree.bbox(self.slots[0])
+            if bbox:
+                self.heading_height, self.row_height = bbox[1], max(1, bbox[3])
+
+        height = self.tree.winfo_height() - self.heading_height
+        return max(1, height // self.row_height)
+
+    def refresh(self):
+        visible = self._visible_count()
+        self.top = max(0, min(self.top, self.total - visible))
+        count = max(0, min(visible + self.buffer, self.total - self.top))
+
+        while len(self.slots) < count:
+            self.slots.append(self.tree.insert("", tk.END))
+        while len(self.slots) > count:
+            slot = self.slots.pop()
+            self._slot_state.pop(slot, None)
+            self.tree.delete(slot)
+
+        self._slot_lines = {}
+        selected_slot = None
+
+        for i, slot in enumerate(self.slots):
+            g, row = self._line(self.top + i)
+            if row is None:
+                values, tags = self.groups[g]["values"], ("group",)
+            else:
+                values, tags = self.row_values(row), ("item",)
+
+            state = (tuple(values), tags)
+            if self._slot_state.get(slot) != state:
+                self.tree.item(slot, values=values, tags=tags)
+                self._slot_state[slot] = state
+            self._slot_lines[slot] = (g, row)
+            if self._key(g, row) == self.selected:
+                selected_slot = slot
+
+        current = self.tree.selection()
+        if selected_slot is None and current:
+            self._user_pick = False
+            self.tree.selection_remove(*current)
+        elif selected_slot is not None and current != (selected_slot,):
+            self._user_pick = False
+            self.tree.selection_set(selected_slot)
+
+        self.tree.yview_moveto(0)
+        self._update_scrollbar(visible)
+
+    def _update_scrollbar(self, visible):
+        if not self.total:
+            self.scrollbar.set(0, 1)
+            return
+        first = self.top / self.total
+        last = min(1.0, (self.top + visible) / self.total)
+        self.scrollbar.set(first, last)
+
+    ## SCROLLING AND SELECTION
+
+    def yview(self, *args):
+        if not args:
+            return
+        if args[0] == "moveto":
+            self.top = int(float(args[1]) * self.total)
+        elif args[0] == "scroll":
+            step = self._visible_count() if args[2] == "pages" else 1
+            self.top += int(args[1]) * step
+        self.refresh()
+
+    def _scroll(self, lines):
+        self.top += lines
+        self.refresh()
+        return "break"
+
+    def _on_wheel(self, event):
+        return self._scroll(-3 if event.delta > 0 else 3)
+
+    def _on_press(self, event):
+        self._user_pick = bool(self.tree.identify_row(event.y))
+
+    def _on_tree_select(self, event=None):
+        user_pick, self._user_pick = self._user_pick, False
+        selection = self.tree.selection()
+        if not selection or selection[0] not in self._slot_lines:
+            return
+
+        key = self._key(*self._slot_lines[selection[0]])
+        if key == self.selected and not user_pick:
+            return
+
+        self.selected = key
+        if self.on_select:
+            self.on_select(selection[0])
+
+    def _move(self, step):
+        if not self.total:
+            return "break"
+
+        current = self._line_of_key(self.selected) if self.selected else None
+        target = 0 if current is None else max(0, min(self.total - 1, current + step))
+        self.selected = self._key(*self._line(target))
+
+        visible = self._visible_count()
+        if target < self.top:
+            self.top = target
+        elif target >= self.top + visible:
+            self.top = target - visible + 1
+
+        self.refresh()
+        slot = self.slots[target - self.top]
+        self.tree.focus(slot)
+        if self.on_select:
+            self.on_select(slot)
+        return "break"
@@ -0,0 +1,77 @@
+from concurrent.futures import ThreadPoolExecutor
+import queue
+
+
+class ComputeExecutor:
+    """Runs jobs on a thread pool and delivers their results on the Tk loop.
+
+    Jobs are submitted under a key; a newer job for the same key supersedes the
+    older one, which is cancelled if it has not started and ignored otherwise.
+    """
+
+    def __init__(self, widget, max_workers: int = 2, poll_ms: int = 15):
+        self.widget = widget
+        self.poll_ms = poll_ms
+        self.pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="compute")
+        self.results = queue.Queue()
+        self.generations = {}
+        self.futures = {}
+        self._polling = None
+
+    def submit(self, key, fn, *args, on_done=None, on_error=None):
+        generation = self.generations.get(key, 0) + 1
+        self.generations[key] = generation
+
+        previous = self.futures.pop(key, None)
+        if previous is not None:
+            previous.cancel()
+
+        future = self.pool.submit(fn, *args)
+        self.futures[key] = future
+        future.add_done_callback(
+            lambda f: self.results.put((key, generation, f, on_done, on_error))
+        )
+        self._poll_soon()
+        return generation
+
+    def cancel(self, key):
+        self.generations[key] = self.generations.get(key, 0) + 1
+        previous = self.futures.pop(key, None)
+        if previous is not None:
+            previous.cancel()
+
+    def is_current(self, key, generation) -> bool:
+        return self.generations.get(key) == generation
+
+    def _poll_soon(self):
+        if self._polling is None:
+            self._polling = self.widget.after(self.poll_ms, self._poll)
+
+    def _poll(self):
+        self._polling = None
+
+        while True:
+            try:
+                key, generation, future, on_done, on_error = self.results.get_nowait()
+            except queue.Empty:
+                break
+
+            if future.cancelled() or not self.is_current(key, generation):
+                continue
+            self.futures.pop(key, None)
+
+            error = future.exception()
+            if error is not None:
+                if on_error:
+                    on_error(error)
+            elif on_done:
+                on_done(future.result())
+
+        if self.futures:
+            self._poll_soon()
+
+    def shutdown(self):
+        if self._polling is not None:
+            self.widget.after_cancel(self._polling)
+            self._polling = None
+        self.pool.shutdown(wait=False, cancel_futures=True)